@@ -3,30 +3,23 @@ import sys
 import time
 import threading
 import logging
+import logging.handlers
+import queue
+import atexit
 import struct
 import binascii
+import bisect
+import mmap
 import re
+import socket
 import datetime
-import hashlib
-from typing import List, Dict, Optional, Tuple, Union, Callable
-import json
-from typing import List, Dict, Optional, Callable, Any
+from array import array
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 # For K+DCAN communication
 import serial
 import serial.tools.list_ports
 
-# GUI imports
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                            QHBoxLayout, QPushButton, QLabel, QProgressBar, 
-                            QComboBox, QMessageBox, QFileDialog, QFrame,
-                            QSplashScreen, QListWidget, QListWidgetItem, 
-                            QTextEdit, QGroupBox, QGridLayout, QSpacerItem,
-                            QSizePolicy, QTabWidget, QCheckBox, QDialog)
-from PyQt5.QtGui import QFont, QPixmap, QIcon, QColor, QPalette, QTextCursor
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QThread, QSize
-
-# Import our tune matcher
-from tune_matcher import TuneMatcher
 # Safe path for log file
 log_file_path = os.path.join(
     os.path.dirname(sys.executable if getattr(sys, 'frozen', False) else __file__),
@@ -34,16 +27,26 @@ log_file_path = os.path.join(
 )
 
 # Set up logging
-logging.basicConfig(level=logging.INFO, 
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                    filename=log_file_path)
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+# The log file is written from a listener thread, so logging never blocks the
+# flash loop on file I/O; each record is written as it arrives so the progress
+# trail survives a crash
+file_handler = logging.FileHandler(log_file_path)
+file_handler.setFormatter(formatter)
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, file_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+logging.root.setLevel(logging.INFO)
+logging.root.addHandler(logging.handlers.QueueHandler(log_queue))
 
 logger = logging.getLogger('RFTX')
 
 # Add console handler for debugging
 console_handler = logging.StreamHandler()
 console_handler.setLevel(logging.INFO)
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 console_handler.setFormatter(formatter)
 logger.addHandler(console_handler)
 
@@ -52,6 +55,44 @@ logger.addHandler(console_handler)
 CAN_ID_REQUEST = 0x6F1  # Diagnostic request ID
 CAN_ID_RESPONSE = 0x6F9  # Diagnostic response ID
 
+# Response timeout used while probing for the protocol; a live ECU answers within P2 (50 ms)
+PROBE_TIMEOUT = 1.0
+
+# Serial framing of a CAN frame on the K+DCAN link: [CAN ID (4 bytes), DLC (1 byte)]
+CAN_FRAME_HEADER = struct.Struct(">IB")
+CAN_FRAME_MAX_SIZE = CAN_FRAME_HEADER.size + 8
+
+# Linux SocketCAN interface names; these are opened with the kernel's ISO-TP sockets
+SOCKETCAN_INTERFACE_PATTERN = re.compile(r"(v|sl)?can\d+$")
+
+# Kernel ISO-TP socket options (linux/can/isotp.h), not all exported by the socket module
+SOL_CAN_ISOTP = 106  # SOL_CAN_BASE + CAN_ISOTP
+CAN_ISOTP_OPTS = 1
+CAN_ISOTP_TX_PADDING = 0x004
+CAN_ISOTP_OPTIONS = struct.Struct("=IIBBBB")  # flags, frame_txtime, ext_address, txpad, rxpad, rx_ext_address
+
+# OS serial buffer size requested on connect (~10k CAN frames)
+SERIAL_BUFFER_SIZE = 1 << 17
+
+# Backup blocks queued for the file writer thread while the next block is read
+BACKUP_WRITE_QUEUE_DEPTH = 4
+
+# Zero padding for short CAN frames, indexed by the number of missing bytes
+FRAME_PADDING = tuple(bytes(i) for i in range(8))
+
+# ISO-TP flow control frame
+FLOW_CONTROL_CONTINUE = b'\x30\x00\x00\x00\x00\x00\x00\x00'  # Block size 0, no delay
+
+# Bit-reversed value of every byte, used to run MSB-first CRCs through binascii.crc32
+BIT_REVERSE_TABLE = bytes(int(f"{i:08b}"[::-1], 2) for i in range(256))
+
+# Port descriptions of common USB-to-serial chips used in K+DCAN cables
+ADAPTER_DESCRIPTION_PATTERN = re.compile(r"USB|CH340|FTDI|Silicon Labs|Prolific")
+
+# Diagnostic protocols
+PROTOCOL_UDS = "UDS"
+PROTOCOL_KWP2000 = "KWP2000"
+
 # Protocol service IDs
 # KWP2000 service IDs
 KWP_START_DIAGNOSTIC_SESSION = 0x10
@@ -91,6 +132,79 @@ UDS_TESTER_PRESENT = 0x3E
 POSITIVE_RESPONSE = 0x40
 NEGATIVE_RESPONSE = 0x7F
 
+# Request headers for the memory services (4-byte addresses)
+KWP_READ_MEMORY_REQUEST = struct.Struct(">IB")  # address, size
+KWP_WRITE_MEMORY_REQUEST = struct.Struct(">I")  # address
+KWP_ERASE_MEMORY_REQUEST = struct.Struct(">BII")  # routine ID, address, size
+UDS_READ_MEMORY_REQUEST = struct.Struct(">BIH")  # address and length format, address, size
+UDS_REQUEST_DOWNLOAD_REQUEST = struct.Struct(">BBIBI")  # data format, address format, address, size format, size
+UDS_ERASE_MEMORY_REQUEST = struct.Struct(">BHII")  # routine control type, routine ID, address, size
+
+# KWP2000 DTC record: status, DTC code
+KWP_DTC_RECORD = struct.Struct(">BH")
+
+# UDS DTC record: DTC high byte, DTC mid/low bytes, status
+UDS_DTC_RECORD = struct.Struct(">BHB")
+
+# OBD-II DTC type letter, indexed by the top two bits of the DTC high byte
+DTC_TYPE_LETTERS = "PCBU"  # Powertrain, Chassis, Body, Network
+
+# DTC status byte as an 8-digit binary string, indexed by status
+DTC_STATUS_BITS = tuple(format(status, '08b') for status in range(256))
+
+# Big-endian 16-bit live data value
+LIVE_DATA_WORD = struct.Struct(">H")
+
+# Live data decoders per OBD-II PID: (minimum data length, decoder, unit)
+LIVE_DATA_DECODERS = MappingProxyType({
+    0x0C: (2, lambda data: LIVE_DATA_WORD.unpack_from(data)[0] / 4, "RPM"),    # RPM
+    0x0D: (1, lambda data: data[0], "km/h"),                          # Speed
+    0x0F: (1, lambda data: data[0] - 40, "°C"),                       # IAT (Intake Air Temperature)
+    0x10: (2, lambda data: LIVE_DATA_WORD.unpack_from(data)[0] / 100, "g/s"),  # MAF (Mass Air Flow)
+    0x11: (1, lambda data: data[0] * 100 / 255, "%"),                 # TPS (Throttle Position)
+    0x0B: (1, lambda data: data[0], "kPa"),                           # MAP (Manifold Absolute Pressure)
+})
+
+# Live data sample columns: (name, OBD-II PID)
+LIVE_DATA_COLUMNS = (
+    ("rpm", 0x0C),
+    ("speed", 0x0D),
+    ("iat", 0x0F),
+    ("maf", 0x10),
+    ("tps", 0x11),
+    ("map", 0x0B),
+)
+
+# UDS DID bytes for each OBD-II PID (typically 0xF400 + PID)
+LIVE_DATA_DIDS = tuple(bytes((0xF4, pid)) for pid in range(256))
+
+# UDS identification DIDs read by read_ecu_info, with the attribute/key each one fills
+ECU_INFO_DIDS = (
+    (b'\xF1\x90', 'vin'),
+    (b'\xF1\x8A', 'ecu_id'),
+    (b'\xF1\x89', 'sw_version'),
+    (b'\xF1\x91', 'hw_version'),
+)
+
+# Largest message ISO-TP can carry (12-bit length in the first frame)
+ISOTP_MAX_MESSAGE_SIZE = 4095
+
+# PCI bytes of a run of consecutive frames, sliced from the starting sequence number
+CONSECUTIVE_FRAME_PCI = bytes(0x20 | (i & 0x0F) for i in range(16 + ISOTP_MAX_MESSAGE_SIZE // 7 + 1))
+
+# Largest memory read per request: the UDS response also carries the SID and
+# KWP2000 encodes the read size in one byte
+UDS_MAX_READ_SIZE = ISOTP_MAX_MESSAGE_SIZE - 1
+KWP_MAX_READ_SIZE = 0xFF
+
+# Tester present requests with the "no response" flag set, sent by the keep-alive
+TESTER_PRESENT_UDS_REQUEST = b'\x3E\x80'
+TESTER_PRESENT_KWP_REQUEST = b'\x3E\x02'
+
+# The same requests as complete CAN frames, written as-is on the serial link
+TESTER_PRESENT_UDS_FRAME = CAN_FRAME_HEADER.pack(CAN_ID_REQUEST, 8) + b'\x02' + TESTER_PRESENT_UDS_REQUEST.ljust(7, b'\x00')
+TESTER_PRESENT_KWP_FRAME = CAN_FRAME_HEADER.pack(CAN_ID_REQUEST, 8) + b'\x02' + TESTER_PRESENT_KWP_REQUEST.ljust(7, b'\x00')
+
 # Negative response codes
 NRC_GENERAL_REJECT = 0x10
 NRC_SERVICE_NOT_SUPPORTED = 0x11
@@ -137,7 +251,7 @@ ECU_MEMORY_MAPS = {
             {"name": "Calibration", "start": 0x810000, "size": 0x40000, "protected": False},
             {"name": "Program", "start": 0x850000, "size": 0xB0000, "protected": True}
         ],
-        "protocol": "KWP2000",
+        "protocol": PROTOCOL_KWP2000,
         "security_algorithm": "xor",
         "seed_key_length": 2,
         "transfer_size": 0x200,  # 512 bytes
@@ -152,7 +266,7 @@ ECU_MEMORY_MAPS = {
             {"name": "Calibration", "start": 0x810000, "size": 0x40000, "protected": False},
             {"name": "Program", "start": 0x850000, "size": 0xB0000, "protected": True}
         ],
-        "protocol": "KWP2000",
+        "protocol": PROTOCOL_KWP2000,
         "security_algorithm": "xor",
         "seed_key_length": 2,
         "transfer_size": 0x200,  # 512 bytes
@@ -167,7 +281,7 @@ ECU_MEMORY_MAPS = {
             {"name": "Calibration", "start": 0x810000, "size": 0x80000, "protected": False},
             {"name": "Program", "start": 0x890000, "size": 0x170000, "protected": True}
         ],
-        "protocol": "UDS",
+        "protocol": PROTOCOL_UDS,
         "security_algorithm": "crc",
         "seed_key_length": 4,
         "transfer_size": 0x800,  # 2KB
@@ -182,7 +296,7 @@ ECU_MEMORY_MAPS = {
             {"name": "Calibration", "start": 0x810000, "size": 0x30000, "protected": False},
             {"name": "Program", "start": 0x840000, "size": 0xC0000, "protected": True}
         ],
-        "protocol": "UDS",
+        "protocol": PROTOCOL_UDS,
         "security_algorithm": "crc",
         "seed_key_length": 4,
         "transfer_size": 0x400,  # 1KB
@@ -197,7 +311,7 @@ ECU_MEMORY_MAPS = {
             {"name": "Calibration", "start": 0x810000, "size": 0x30000, "protected": False},
             {"name": "Program", "start": 0x840000, "size": 0xC0000, "protected": True}
         ],
-        "protocol": "UDS",
+        "protocol": PROTOCOL_UDS,
         "security_algorithm": "crc",
         "seed_key_length": 4,
         "transfer_size": 0x400,  # 1KB
@@ -215,13 +329,103 @@ DEFAULT_MEMORY_MAP = {
         {"name": "Calibration", "start": 0x810000, "size": 0x40000, "protected": False},
         {"name": "Program", "start": 0x850000, "size": 0xB0000, "protected": True}
     ],
-    "protocol": "KWP2000",
+    "protocol": PROTOCOL_KWP2000,
     "security_algorithm": "xor",
     "seed_key_length": 2,
     "transfer_size": 0x200,  # 512 bytes
     "erase_required": True
 }
 
+def _freeze_memory_map(memory_map: Dict) -> MappingProxyType:
+    """Return a read-only memory map with a start-address index of its sectors for bisect lookups
+    and the total size of its sectors."""
+    sectors = tuple(MappingProxyType(dict(sector)) for sector in memory_map["sectors"])
+    sectors_by_start = tuple(sorted(sectors, key=lambda sector: sector["start"]))
+    return MappingProxyType(dict(
+        memory_map,
+        sectors=sectors,
+        sectors_by_start=sectors_by_start,
+        sector_starts=tuple(sector["start"] for sector in sectors_by_start),
+        total_size=sum(sector["size"] for sector in sectors)
+    ))
+
+# Memory maps are shared by every flasher instance, so keep them read-only
+ECU_MEMORY_MAPS = MappingProxyType({ecu_type: _freeze_memory_map(memory_map)
+                                    for ecu_type, memory_map in ECU_MEMORY_MAPS.items()})
+DEFAULT_MEMORY_MAP = _freeze_memory_map(DEFAULT_MEMORY_MAP)
+
+# Matches any known ECU type in an ECU ID, longest names first
+ECU_TYPE_PATTERN = re.compile("|".join(re.escape(ecu_type)
+                                       for ecu_type in sorted(ECU_MEMORY_MAPS, key=len, reverse=True)))
+
+def is_positive_response(response: Optional[bytes], service_id: int) -> bool:
+    """Return True if the response is the positive response to the given service."""
+    # Positive response SID = request SID with bit 6 (0x40) set
+    return bool(response) and response[0] == service_id | POSITIVE_RESPONSE
+
+def find_sector(memory_map: Dict, address: int) -> Optional[Dict]:
+    """Return the sector of the memory map that contains the address, or None."""
+    index = bisect.bisect_right(memory_map["sector_starts"], address) - 1
+    if index < 0:
+        return None
+    sector = memory_map["sectors_by_start"][index]
+    if address >= sector["start"] + sector["size"]:
+        return None
+    return sector
+
+def split_did_records(payload: bytes, tags: List[bytes], min_lengths: List[int] = None) -> Dict[bytes, bytes]:
+    """Split a multi-DID ReadDataByIdentifier payload into the data of each DID.
+    
+    Records come back in request order as DID + data and unsupported DIDs are
+    omitted, so each record ends where the next requested DID that is present
+    starts. min_lengths[i], when given, is skipped before searching past tags[i].
+    """
+    records = {}
+    pos = 0
+    for index, tag in enumerate(tags):
+        if payload[pos:pos + 2] != tag:
+            continue
+        start = pos + 2
+        search_from = start + (min_lengths[index] if min_lengths else 0)
+        end = len(payload)
+        for next_tag in tags[index + 1:]:
+            found = payload.find(next_tag, search_from)
+            if found != -1:
+                end = found
+                break
+        records[tag] = payload[start:end]
+        pos = end
+    return records
+
+def flash_block(flash_data: bytes, start: int, length: int) -> bytes:
+    """Return length bytes of the flash image from start, padded with 0xFF past its end.
+    
+    Slicing a memoryview of the image returns a view without copying; only a block
+    running past the end of the image is copied, to add the padding.
+    """
+    block = flash_data[start:start+length]
+    if len(block) < length:
+        block = bytes(block) + b'\xFF' * (length - len(block))
+    return block
+
+def build_consecutive_frames(can_id: int, data: bytes, data_index: int,
+                             sequence_number: int, frame_count: int) -> bytearray:
+    """Lay out consecutive frames as serial CAN frames, zero-padded to 8 data bytes.
+    
+    Each byte position is filled for all frames with one slice assignment, so the
+    work per frame happens in C rather than in a Python loop.
+    """
+    burst = bytearray(frame_count * CAN_FRAME_MAX_SIZE)
+    for column, value in enumerate(CAN_FRAME_HEADER.pack(can_id, 8)):
+        if value:
+            burst[column::CAN_FRAME_MAX_SIZE] = bytes((value,)) * frame_count
+    pci_column = CAN_FRAME_HEADER.size
+    burst[pci_column::CAN_FRAME_MAX_SIZE] = CONSECUTIVE_FRAME_PCI[sequence_number:sequence_number + frame_count]
+    payload = data[data_index:data_index + 7 * frame_count].ljust(7 * frame_count, b'\x00')
+    for column in range(7):
+        burst[pci_column + 1 + column::CAN_FRAME_MAX_SIZE] = payload[column::7]
+    return burst
+
 class ISOTPHandler:
     """Handles ISO-TP (ISO 15765-2) protocol for CAN communication."""
     
@@ -233,6 +437,16 @@ class ISOTPHandler:
         self.fc_timeout = 1.0  # Flow control timeout
         self.st_min = 0  # Minimum separation time between consecutive frames
         self.block_size = 0  # Number of frames before flow control
+        # Reusable buffer for outgoing CAN frames (header + up to 8 data bytes),
+        # only built and written while holding tx_lock
+        self._frame_buf = bytearray(CAN_FRAME_MAX_SIZE)
+        self._frame_view = memoryview(self._frame_buf)
+        # Serializes frame building and port writes with the watchdog thread
+        self.tx_lock = threading.Lock()
+        # Received bytes not yet parsed into CAN frames
+        self._rx_buf = bytearray()
+        # Read timeout last applied to the port (None until the first read)
+        self._port_timeout = None
         
     def send(self, data: bytes) -> Optional[bytes]:
         """Send data using ISO-TP protocol and return the response."""
@@ -246,14 +460,7 @@ class ISOTPHandler:
     def _send_single_frame(self, data: bytes) -> Optional[bytes]:
         """Send a single frame ISO-TP message."""
         # Single frame format: [0x0X, data] where X is the length
-        frame = bytes([0x00 | len(data)]) + data
-        
-        # Pad to 8 bytes
-        if len(frame) < 8:
-            frame += b'\x00' * (8 - len(frame))
-            
-        # Send CAN frame
-        self._send_can_frame(self.tx_id, frame)
+        self._send_padded_frame(len(data), data)
         
         # Receive response
         return self._receive_isotp()
@@ -262,7 +469,7 @@ class ISOTPHandler:
         """Send a multi-frame ISO-TP message."""
         # First frame format: [0x1X, YY, data] where X is the high nibble of length, YY is the low byte
         data_length = len(data)
-        first_frame = bytes([0x10 | ((data_length >> 8) & 0x0F), data_length & 0xFF]) + data[:6]
+        first_frame = bytes((0x10 | ((data_length >> 8) & 0x0F), data_length & 0xFF)) + data[:6]
         
         # Send first frame
         self._send_can_frame(self.tx_id, first_frame)
@@ -282,31 +489,35 @@ class ISOTPHandler:
         data_index = 6
         
         while data_index < data_length:
-            # Wait for minimum separation time
-            if self.st_min <= 127:
-                # milliseconds
-                time.sleep(self.st_min / 1000.0)
-            elif self.st_min >= 0xF1 and self.st_min <= 0xF9:
-                # 100-900 microseconds (0xF1 = 100us, 0xF9 = 900us)
-                time.sleep((self.st_min - 0xF0) * 100 / 1000000.0)
-            
-            # Prepare consecutive frame
-            remaining = data[data_index:data_index+7]
-            consecutive_frame = bytes([0x20 | (sequence_number & 0x0F)]) + remaining
-            
-            # Pad to 8 bytes
-            if len(consecutive_frame) < 8:
-                consecutive_frame += b'\x00' * (8 - len(consecutive_frame))
-            
-            # Send frame
-            self._send_can_frame(self.tx_id, consecutive_frame)
-            
-            # Update counters
-            sequence_number = (sequence_number + 1) & 0x0F
-            data_index += 7
-            
-            # Check if we need to wait for another flow control frame
-            if self.block_size != 0 and sequence_number % self.block_size == 0 and data_index < data_length:
+            # Number of consecutive frames until the next flow control (block size 0 = no limit)
+            block_frames = (data_length - data_index + 6) // 7
+            if self.block_size != 0:
+                block_frames = min(block_frames, self.block_size)
+                
+            separation_time = self._separation_time()
+            if not separation_time:
+                # No separation time required: send the whole block in a single write
+                sequence_number, data_index = self._send_consecutive_burst(
+                    data, data_index, sequence_number, block_frames)
+            else:
+                next_frame_time = time.monotonic()
+                for _ in range(block_frames):
+                    # Wait out what is left of the separation time; the write itself
+                    # already used part of it
+                    delay = next_frame_time - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    
+                    # Send consecutive frame
+                    self._send_padded_frame(0x20 | sequence_number, data[data_index:data_index+7])
+                    next_frame_time = time.monotonic() + separation_time
+                    
+                    # Update counters
+                    sequence_number = (sequence_number + 1) & 0x0F
+                    data_index += 7
+                    
+            # Wait for another flow control frame if the block is complete but data remains
+            if data_index < data_length:
                 fc_frame = self._receive_can_frame(self.rx_id, timeout=self.fc_timeout)
                 if not fc_frame or len(fc_frame) < 3 or fc_frame[0] != 0x30:
                     logger.error("No valid flow control received during consecutive frames")
@@ -318,6 +529,31 @@ class ISOTPHandler:
         # Receive response
         return self._receive_isotp()
     
+    def _separation_time(self) -> float:
+        """Return the minimum separation time between consecutive frames in seconds."""
+        if 0 < self.st_min <= 127:
+            # milliseconds
+            return self.st_min / 1000.0
+        elif self.st_min >= 0xF1 and self.st_min <= 0xF9:
+            # 100-900 microseconds (0xF1 = 100us, 0xF9 = 900us)
+            delay = (self.st_min - 0xF0) * 100 / 1000000.0
+            # On Windows sleep() rounds sub-millisecond delays up to a full scheduler tick,
+            # while the USB round-trip of each serial write already exceeds the short ones
+            if sys.platform != 'win32' or delay >= 0.0005:
+                return delay
+        return 0.0
+    
+    def _send_consecutive_burst(self, data: bytes, data_index: int,
+                                sequence_number: int, frame_count: int) -> Tuple[int, int]:
+        """Send several consecutive frames with one serial write.
+        
+        Returns the updated (sequence_number, data_index).
+        """
+        burst = build_consecutive_frames(self.tx_id, data, data_index, sequence_number, frame_count)
+        with self.tx_lock:
+            self.port.write(burst)
+        return (sequence_number + frame_count) & 0x0F, data_index + 7 * frame_count
+    
     def _receive_isotp(self) -> Optional[bytes]:
         """Receive an ISO-TP message."""
         # Receive first frame
@@ -336,18 +572,32 @@ class ISOTPHandler:
         # First frame of multi-frame response
         elif frame_type == 0x10:
             length = ((frame[0] & 0x0F) << 8) | frame[1]
-            response_data = bytearray(frame[2:8])
+            
+            # Allocate the whole message once and fill it in place
+            response_data = bytearray(length)
+            chunk = frame[2:2+min(6, length)]
+            response_data[:len(chunk)] = chunk
+            position = len(chunk)
             
             # Send flow control
-            fc_frame = bytes([0x30, 0, 0])  # Flow control, block size 0, no delay
-            fc_frame += b'\x00' * (8 - len(fc_frame))  # Pad to 8 bytes
-            self._send_can_frame(self.tx_id, fc_frame)
+            self._send_can_frame(self.tx_id, FLOW_CONTROL_CONTINUE)
             
             # Receive consecutive frames
             expected_sequence = 1
-            
-            while len(response_data) < length:
-                cf_frame = self._receive_can_frame(self.rx_id, timeout=self.timeout)
+            bulk = True
+            
+            while position < length:
+                if bulk:
+                    # Take the frames that are already buffered in one step
+                    taken = self._take_consecutive_frames(response_data, position, expected_sequence)
+                    if taken:
+                        position = min(length, position + 7 * taken)
+                        expected_sequence = (expected_sequence + taken) & 0x0F
+                        continue
+                    # Irregular frames (other IDs, short DLC) go through the per-frame checks
+                    bulk = taken is not None
+                    
+                cf_frame = self._receive_can_frame(self.rx_id, timeout=self.timeout, drain=True)
                 if not cf_frame:
                     logger.error("No consecutive frame received")
                     return None
@@ -361,59 +611,187 @@ class ISOTPHandler:
                     logger.error(f"Wrong sequence number: expected {expected_sequence}, got {sequence}")
                     return None
                     
-                response_data.extend(cf_frame[1:8])
+                chunk = cf_frame[1:1+min(7, length - position)]
+                response_data[position:position+len(chunk)] = chunk
+                position += len(chunk)
                 expected_sequence = (expected_sequence + 1) & 0x0F
             
-            return bytes(response_data[:length])
+            return bytes(response_data)
         
         # Unexpected frame type
         else:
             logger.error(f"Unexpected frame type: {frame_type:02X}")
             return None
     
+    def _take_consecutive_frames(self, response_data: bytearray, position: int,
+                                 expected_sequence: int) -> Optional[int]:
+        """Copy the consecutive frames buffered in _rx_buf into response_data.
+        
+        The frames are checked and unpacked one byte position at a time with
+        slices. Returns the number of frames taken, 0 if fewer than two are
+        buffered, or None if the buffered frames are not all regular 8-byte
+        consecutive frames in sequence.
+        """
+        rx_buf = self._rx_buf
+        frames_left = (len(response_data) - position + 6) // 7
+        count = min(len(rx_buf) // CAN_FRAME_MAX_SIZE, frames_left)
+        if count < 2:
+            return 0
+            
+        block = bytes(rx_buf[:count * CAN_FRAME_MAX_SIZE])
+        for column, value in enumerate(CAN_FRAME_HEADER.pack(self.rx_id, 8)):
+            if block[column::CAN_FRAME_MAX_SIZE] != bytes((value,)) * count:
+                return None
+        pci_column = CAN_FRAME_HEADER.size
+        if block[pci_column::CAN_FRAME_MAX_SIZE] != CONSECUTIVE_FRAME_PCI[expected_sequence:expected_sequence + count]:
+            return None
+            
+        payload = bytearray(7 * count)
+        for column in range(7):
+            payload[column::7] = block[pci_column + 1 + column::CAN_FRAME_MAX_SIZE]
+        end = min(len(response_data), position + len(payload))
+        response_data[position:end] = payload[:end - position]
+        del rx_buf[:len(block)]
+        return count
+        
+    def send_tester_present(self, protocol: str) -> None:
+        """Send a tester present request without waiting for a response."""
+        with self.tx_lock:
+            self.port.write(TESTER_PRESENT_UDS_FRAME if protocol == PROTOCOL_UDS else TESTER_PRESENT_KWP_FRAME)
+        
     def _send_can_frame(self, can_id: int, data: bytes) -> None:
-        """Send a CAN frame through the serial port."""
+        """Send a CAN frame through the serial port.
+        
+        The port is not flushed: flush() waits until the UART has sent every byte
+        (tcdrain), while the following read waits for the ECU's answer anyway.
+        """
         # Format: [CAN ID (4 bytes), DLC (1 byte), data (up to 8 bytes)]
-        can_frame = struct.pack(">I", can_id) + bytes([len(data)]) + data
-        self.port.write(can_frame)
-        self.port.flush()
+        end = CAN_FRAME_HEADER.size + len(data)
+        with self.tx_lock:
+            CAN_FRAME_HEADER.pack_into(self._frame_buf, 0, can_id, len(data))
+            self._frame_buf[CAN_FRAME_HEADER.size:end] = data
+            self.port.write(self._frame_view[:end])
+        
+    def _send_padded_frame(self, pci: int, data: bytes) -> None:
+        """Send an 8-byte ISO-TP frame, built in place from its PCI byte and up to 7 data bytes."""
+        frame_buf = self._frame_buf
+        data_end = CAN_FRAME_HEADER.size + 1 + len(data)
+        # The watchdog thread sends through here too, so the shared buffer
+        # is filled under the same lock as the write
+        with self.tx_lock:
+            CAN_FRAME_HEADER.pack_into(frame_buf, 0, self.tx_id, 8)
+            frame_buf[CAN_FRAME_HEADER.size] = pci
+            frame_buf[CAN_FRAME_HEADER.size + 1:data_end] = data
+            frame_buf[data_end:] = FRAME_PADDING[CAN_FRAME_MAX_SIZE - data_end]
+            self.port.write(self._frame_view)
+        
+    def _receive_can_frame(self, expected_id: int = None, timeout: float = None,
+                           drain: bool = False) -> Optional[bytes]:
+        """Receive a CAN frame from the serial port.
         
-    def _receive_can_frame(self, expected_id: int = None, timeout: float = None) -> Optional[bytes]:
-        """Receive a CAN frame from the serial port."""
+        With drain, each read also takes whatever the adapter has already received,
+        for consecutive frames that queue up behind this one. Asking for the queued
+        byte count is a call of its own, so single frames are read without it.
+        """
         if timeout is None:
             timeout = self.timeout
             
-        # Save original timeout
-        original_timeout = self.port.timeout
-        self.port.timeout = timeout
-        
-        try:
-            # Read CAN ID and DLC
-            header = self.port.read(5)
-            if len(header) != 5:
-                logger.error("Timeout waiting for CAN frame header")
-                return None
-                
-            # Extract CAN ID and DLC
-            can_id = struct.unpack(">I", header[:4])[0]
-            dlc = header[4]
-            
-            # Check if this is the expected ID
-            if expected_id is not None and can_id != expected_id:
-                logger.warning(f"Received unexpected CAN ID: 0x{can_id:X}, expected: 0x{expected_id:X}")
-                return None
+        # Read until a complete frame is buffered
+        rx_buf = self._rx_buf
+        while True:
+            if len(rx_buf) >= CAN_FRAME_HEADER.size:
+                frame_end = CAN_FRAME_HEADER.size + rx_buf[4]
+                if len(rx_buf) >= frame_end:
+                    break
+                needed = frame_end - len(rx_buf)
+            else:
+                needed = CAN_FRAME_HEADER.size - len(rx_buf)
+                    
+            # Only touch the port timeout when it changes, setting it is a syscall
+            if timeout != self._port_timeout:
+                self.port.timeout = timeout
+                self._port_timeout = timeout
                 
-            # Read data
-            data = self.port.read(dlc)
-            if len(data) != dlc:
-                logger.error(f"Timeout waiting for CAN data, expected {dlc} bytes")
+            chunk = self.port.read(max(needed, self.port.in_waiting) if drain else needed)
+            rx_buf += chunk
+            if len(chunk) < needed:
+                if len(rx_buf) < CAN_FRAME_HEADER.size:
+                    logger.error("Timeout waiting for CAN frame header")
+                else:
+                    logger.error(f"Timeout waiting for CAN data, expected {rx_buf[4]} bytes")
+                # Drop the partial frame so the next receive starts on a frame boundary
+                rx_buf.clear()
                 return None
+                    
+        # Extract CAN ID and data
+        can_id, dlc = CAN_FRAME_HEADER.unpack_from(rx_buf)
+        data = bytes(rx_buf[CAN_FRAME_HEADER.size:frame_end])
+        del rx_buf[:frame_end]
+            
+        # Check if this is the expected ID
+        if expected_id is not None and can_id != expected_id:
+            # Can fire for every frame of other bus traffic, so let logging format it only if emitted
+            logger.warning("Received unexpected CAN ID: 0x%X, expected: 0x%X", can_id, expected_id)
+            return None
                 
-            return data
-            
-        finally:
-            # Restore original timeout
-            self.port.timeout = original_timeout
+        return data
+
+
+class SocketCANISOTPHandler:
+    """ISO-TP over a Linux SocketCAN interface, using the kernel's CAN_ISOTP sockets.
+    
+    The kernel does the segmentation, flow control and STmin pacing, so each
+    message is a single send() or recv(). The handler also stands in for the
+    serial port in BMWFlasher (is_open/close).
+    """
+    
+    def __init__(self, interface: str, tx_id: int = CAN_ID_REQUEST, rx_id: int = CAN_ID_RESPONSE):
+        self.interface = interface
+        self.tx_id = tx_id
+        self.rx_id = rx_id
+        self.timeout = 5.0  # Default timeout in seconds
+        # Serializes requests with the watchdog's keep-alive messages
+        self.tx_lock = threading.Lock()
+        # Timeout last applied to the socket (None until the first receive)
+        self._sock_timeout = None
+        
+        self.sock = socket.socket(socket.AF_CAN, socket.SOCK_DGRAM, socket.CAN_ISOTP)
+        try:
+            # Pad frames to 8 bytes like the serial path does; BMW ECUs ignore unpadded frames
+            self.sock.setsockopt(SOL_CAN_ISOTP, CAN_ISOTP_OPTS,
+                                 CAN_ISOTP_OPTIONS.pack(CAN_ISOTP_TX_PADDING, 0, 0, 0, 0, 0))
+            self.sock.bind((interface, rx_id, tx_id))
+        except OSError:
+            self.sock.close()
+            raise
+        self.is_open = True
+        
+    def send(self, data: bytes) -> Optional[bytes]:
+        """Send data using ISO-TP protocol and return the response."""
+        with self.tx_lock:
+            self.sock.send(data)
+        return self._receive_isotp()
+    
+    def send_tester_present(self, protocol: str) -> None:
+        """Send a tester present request without waiting for a response."""
+        with self.tx_lock:
+            self.sock.send(TESTER_PRESENT_UDS_REQUEST if protocol == PROTOCOL_UDS else TESTER_PRESENT_KWP_REQUEST)
+        
+    def _receive_isotp(self) -> Optional[bytes]:
+        """Receive an ISO-TP message."""
+        if self.timeout != self._sock_timeout:
+            self.sock.settimeout(self.timeout)
+            self._sock_timeout = self.timeout
+        try:
+            return self.sock.recv(ISOTP_MAX_MESSAGE_SIZE)
+        except socket.timeout:
+            logger.error("No response received")
+            return None
+        
+    def close(self) -> None:
+        """Close the ISO-TP socket."""
+        self.sock.close()
+        self.is_open = False
 
 
 class BMWFlasher:
@@ -424,7 +802,6 @@ class BMWFlasher:
         self.port = None
         self.isotp = None
         self.connected = False
-        self.protocol = None
         self.security_level = 0
         self.session_type = SESSION_DEFAULT
         self.vin = None
@@ -432,19 +809,59 @@ class BMWFlasher:
         self.sw_version = None
         self.hw_version = None
         self.ecu_type = None
+        self.ecu_type_source_id = None  # ECU ID that ecu_type and ecu_memory_map were derived from
         self.ecu_memory_map = None
         self.in_bootloader = False
-        self.watchdog_timer = None
+        self.watchdog_thread = None
+        self.watchdog_stop = threading.Event()
         self.last_activity = 0
         self.battery_voltage = 0.0
+        self._set_protocol(None)
+        
+    def _set_protocol(self, protocol: Optional[str]):
+        """Set the diagnostic protocol and bind the matching memory access methods."""
+        self.protocol = protocol
+        
+        # Resolve the protocol once here instead of on every block of a backup, flash or verify
+        if protocol == PROTOCOL_KWP2000:
+            self._read_memory = self._read_memory_kwp
+            self._write_memory_block = self._write_memory_kwp
+        else:
+            self._read_memory = self._read_memory_uds
+            self._write_memory_block = self._write_memory_uds
+            
+        # The read block size depends on the protocol, so probe it again
+        self.read_block_size = None
+    
+    def _get_read_block_size(self) -> int:
+        """Return the largest memory read the ECU accepts, probing it once per connection."""
+        if self.read_block_size:
+            return self.read_block_size
+            
+        max_size = KWP_MAX_READ_SIZE if self.protocol == PROTOCOL_KWP2000 else UDS_MAX_READ_SIZE
+        min_size = min(self.ecu_memory_map["transfer_size"], max_size)
+        
+        # Try aligned power-of-two sizes from the largest down, clamped to the protocol
+        # limit and never below transfer_size; fewer, larger reads mean fewer round trips.
+        # transfer_size is used without a successful probe only if the ECU rejects it too.
+        power = 1 << (max_size - 1).bit_length()
+        while True:
+            size = max(min(power, max_size), min_size)
+            if size == min_size or self._read_memory(self.ecu_memory_map["flash_start"], size, log_errors=False):
+                break
+            power //= 2
+            
+        self.read_block_size = size
+        logger.info(f"Using memory read block size: {self.read_block_size} bytes")
+        return self.read_block_size
         
     def find_available_ports(self) -> List[str]:
         """Find available COM ports that might be K+DCAN adapters."""
-        ports = []
-        for port in serial.tools.list_ports.comports():
-            # Common USB-to-Serial adapters used for K+DCAN
-            if "USB" in port.description or "CH340" in port.description or "FTDI" in port.description:
-                ports.append(port.device)
+        ports = [port.device for port in serial.tools.list_ports.comports()
+                 if port.description and ADAPTER_DESCRIPTION_PATTERN.search(port.description)]
+        # SocketCAN interfaces, when the kernel supports ISO-TP sockets
+        if hasattr(socket, 'CAN_ISOTP') and hasattr(socket, 'if_nameindex'):
+            ports += [name for _, name in socket.if_nameindex() if SOCKETCAN_INTERFACE_PATTERN.match(name)]
         return ports
     
     def connect(self, port_name: str = None) -> bool:
@@ -460,6 +877,11 @@ class BMWFlasher:
             self.port_name = available_ports[0]
             
         try:
+            if SOCKETCAN_INTERFACE_PATTERN.match(self.port_name):
+                # The kernel handles ISO-TP; the handler doubles as the port
+                self.port = self.isotp = SocketCANISOTPHandler(self.port_name)
+                return self._finish_connect()
+                
             # Open serial port
             self.port = serial.Serial(
                 port=self.port_name,
@@ -470,22 +892,19 @@ class BMWFlasher:
                 timeout=1.0
             )
             
+            # Enlarge the OS buffers so a whole ISO-TP block fits without stalling.
+            # Only the Win32 backend supports this; on Linux SocketCAN interfaces
+            # raise the queue instead with `ip link set can0 txqueuelen 1000`.
+            if hasattr(self.port, 'set_buffer_size'):
+                try:
+                    self.port.set_buffer_size(rx_size=SERIAL_BUFFER_SIZE, tx_size=SERIAL_BUFFER_SIZE)
+                except Exception as e:
+                    logger.debug(f"Could not set serial buffer size: {str(e)}")
+            
             # Initialize ISO-TP handler
             self.isotp = ISOTPHandler(self.port)
             
-            # Try to establish communication
-            if not self._initialize_communication():
-                self.port.close()
-                self.port = None
-                self.isotp = None
-                return False
-                
-            # Start watchdog timer
-            self._start_watchdog()
-            
-            self.connected = True
-            logger.info(f"Connected to ECU via {self.port_name}")
-            return True
+            return self._finish_connect()
             
         except Exception as e:
             logger.error(f"Error connecting to ECU: {str(e)}")
@@ -495,21 +914,45 @@ class BMWFlasher:
             self.isotp = None
             return False
     
+    def _finish_connect(self) -> bool:
+        """Detect the protocol on the opened port and start the keep-alive."""
+        # Try to establish communication
+        if not self._initialize_communication():
+            self.port.close()
+            self.port = None
+            self.isotp = None
+            return False
+            
+        # Start watchdog timer
+        self._start_watchdog()
+        
+        self.connected = True
+        logger.info(f"Connected to ECU via {self.port_name}")
+        return True
+    
     def _initialize_communication(self) -> bool:
         """Initialize communication with the ECU and determine protocol."""
-        # Try UDS first
-        logger.info("Trying UDS protocol...")
-        if self._try_uds_communication():
-            self.protocol = "UDS"
-            logger.info("UDS protocol detected")
-            return True
-            
-        # Try KWP2000
-        logger.info("Trying KWP2000 protocol...")
-        if self._try_kwp_communication():
-            self.protocol = "KWP2000"
-            logger.info("KWP2000 protocol detected")
-            return True
+        # Don't wait the full response timeout for a protocol the ECU doesn't speak
+        original_timeout = self.isotp.timeout
+        self.isotp.timeout = PROBE_TIMEOUT
+        
+        try:
+            # Try UDS first
+            logger.info("Trying UDS protocol...")
+            if self._try_uds_communication():
+                self._set_protocol(PROTOCOL_UDS)
+                logger.info("UDS protocol detected")
+                return True
+                
+            # Try KWP2000
+            logger.info("Trying KWP2000 protocol...")
+            if self._try_kwp_communication():
+                self._set_protocol(PROTOCOL_KWP2000)
+                logger.info("KWP2000 protocol detected")
+                return True
+                
+        finally:
+            self.isotp.timeout = original_timeout
             
         logger.error("Failed to establish communication with ECU")
         return False
@@ -517,42 +960,38 @@ class BMWFlasher:
     def _try_uds_communication(self) -> bool:
         """Try to communicate using UDS protocol."""
         # Send tester present
-        response = self._send_uds_command(UDS_TESTER_PRESENT, [0x00])
-        if response and response[0] == UDS_TESTER_PRESENT + POSITIVE_RESPONSE:
+        response = self._send_uds_command(UDS_TESTER_PRESENT, b'\x00')
+        if is_positive_response(response, UDS_TESTER_PRESENT):
             return True
             
         # Try diagnostic session control
-        response = self._send_uds_command(UDS_DIAGNOSTIC_SESSION_CONTROL, [SESSION_DEFAULT])
-        if response and response[0] == UDS_DIAGNOSTIC_SESSION_CONTROL + POSITIVE_RESPONSE:
+        response = self._send_uds_command(UDS_DIAGNOSTIC_SESSION_CONTROL, bytes([SESSION_DEFAULT]))
+        if is_positive_response(response, UDS_DIAGNOSTIC_SESSION_CONTROL):
             return True
             
         return False
     
     def _try_kwp_communication(self) -> bool:
         """Try to communicate using KWP2000 protocol."""
-        # Send tester present
-        response = self._send_kwp_command(KWP_TESTER_PRESENT, [0x00])
-        if response and response[0] == KWP_TESTER_PRESENT + POSITIVE_RESPONSE:
-            return True
-            
-        # Try start diagnostic session
-        response = self._send_kwp_command(KWP_START_DIAGNOSTIC_SESSION, [0x81])  # BMW-specific session type
-        if response and response[0] == KWP_START_DIAGNOSTIC_SESSION + POSITIVE_RESPONSE:
+        # Tester present (3E 00) is the same request in both protocols and was
+        # already sent by _try_uds_communication, so go straight to the session
+        response = self._send_kwp_command(KWP_START_DIAGNOSTIC_SESSION, b'\x81')  # BMW-specific session type
+        if is_positive_response(response, KWP_START_DIAGNOSTIC_SESSION):
             return True
             
         return False
     
-    def _send_uds_command(self, service_id: int, data: List[int]) -> Optional[bytes]:
+    def _send_uds_command(self, service_id: int, data: bytes = b'') -> Optional[bytes]:
         """Send a UDS command to the ECU and return the response."""
         if not self.port or not self.isotp:
             logger.error("Not connected to ECU")
             return None
             
         # Update last activity time
-        self.last_activity = time.time()
+        self.last_activity = time.monotonic()
         
         # Format UDS message
-        message = bytes([service_id]) + bytes(data)
+        message = bytes((service_id,)) + data
         
         try:
             # Send via ISO-TP
@@ -564,10 +1003,10 @@ class BMWFlasher:
                 
                 # Handle response pending
                 if nrc == NRC_RESPONSE_PENDING:
-                    # Wait for the actual response
+                    # Wait for the actual response; the receive blocks until the ECU
+                    # answers, so there is no need to sleep between attempts
                     pending_count = 0
                     while pending_count < 10:  # Limit to 10 retries
-                        time.sleep(0.1)
                         response = self.isotp._receive_isotp()
                         if not response:
                             break
@@ -583,17 +1022,17 @@ class BMWFlasher:
             logger.error(f"Error sending UDS command: {str(e)}")
             return None
     
-    def _send_kwp_command(self, service_id: int, data: List[int]) -> Optional[bytes]:
+    def _send_kwp_command(self, service_id: int, data: bytes = b'') -> Optional[bytes]:
         """Send a KWP2000 command to the ECU and return the response."""
         if not self.port or not self.isotp:
             logger.error("Not connected to ECU")
             return None
             
         # Update last activity time
-        self.last_activity = time.time()
+        self.last_activity = time.monotonic()
         
         # Format KWP2000 message
-        message = bytes([service_id]) + bytes(data)
+        message = bytes((service_id,)) + data
         
         try:
             # Send via ISO-TP
@@ -611,47 +1050,59 @@ class BMWFlasher:
             return None
     
     def _start_watchdog(self):
-        """Start the watchdog timer to keep the ECU awake."""
-        if self.watchdog_timer:
-            self.watchdog_timer.cancel()
-            
+        """Start the watchdog thread to keep the ECU awake."""
+        self._stop_watchdog()
+        
+        # Each watchdog thread gets its own stop event so a stopped thread can't be revived
+        stop_event = threading.Event()
+        
         def watchdog_function():
-            # Check if we need to send tester present
-            current_time = time.time()
-            if current_time - self.last_activity >= 2.0:  # Send every 2 seconds of inactivity
-                if self.protocol == "UDS":
-                    self._send_uds_command(UDS_TESTER_PRESENT, [0x00])
-                else:
-                    self._send_kwp_command(KWP_TESTER_PRESENT, [0x00])
+            # Wake up every second until stopped
+            while not stop_event.wait(1.0):
+                # Check if we need to send tester present
+                idle_time = time.monotonic() - self.last_activity
+                if idle_time >= 2.0:  # Send every 2 seconds of inactivity
+                    self._send_tester_present()
+                        
+                # Check battery voltage periodically
+                if idle_time >= 5.0:  # Check every 5 seconds
+                    self._check_battery_voltage()
                     
-            # Check battery voltage periodically
-            if current_time - self.last_activity >= 5.0:  # Check every 5 seconds
-                self._check_battery_voltage()
-                
-            # Restart timer
-            self.watchdog_timer = threading.Timer(1.0, watchdog_function)
-            self.watchdog_timer.daemon = True
-            self.watchdog_timer.start()
-            
-        # Start the timer
-        self.watchdog_timer = threading.Timer(1.0, watchdog_function)
-        self.watchdog_timer.daemon = True
-        self.watchdog_timer.start()
+        # Start the thread
+        self.watchdog_stop = stop_event
+        self.watchdog_thread = threading.Thread(target=watchdog_function, name="RFTX-watchdog", daemon=True)
+        self.watchdog_thread.start()
+    
+    def _stop_watchdog(self):
+        """Stop the watchdog thread if it is running."""
+        self.watchdog_stop.set()
+        self.watchdog_thread = None
+    
+    def _send_tester_present(self):
+        """Keep the diagnostic session alive without waiting for a response."""
+        if not self.port or not self.isotp:
+            return
+            
+        self.last_activity = time.monotonic()
+        try:
+            self.isotp.send_tester_present(self.protocol)
+        except Exception as e:
+            logger.warning(f"Failed to send tester present: {str(e)}")
     
     def _check_battery_voltage(self):
         """Check the battery voltage."""
         try:
-            if self.protocol == "UDS":
+            if self.protocol == PROTOCOL_UDS:
                 # UDS typically uses DID 0xF405 for battery voltage
-                response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, [0xF4, 0x05])
-                if response and response[0] == UDS_READ_DATA_BY_IDENTIFIER + POSITIVE_RESPONSE:
+                response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, b'\xF4\x05')
+                if is_positive_response(response, UDS_READ_DATA_BY_IDENTIFIER):
                     # Extract voltage (usually 2 bytes representing voltage in 0.1V)
                     voltage_raw = (response[3] << 8) | response[4]
                     self.battery_voltage = voltage_raw / 10.0
             else:
                 # KWP2000 typically uses local ID 0x10 for battery voltage
-                response = self._send_kwp_command(KWP_READ_DATA_BY_LOCAL_ID, [0x10])
-                if response and response[0] == KWP_READ_DATA_BY_LOCAL_ID + POSITIVE_RESPONSE:
+                response = self._send_kwp_command(KWP_READ_DATA_BY_LOCAL_ID, b'\x10')
+                if is_positive_response(response, KWP_READ_DATA_BY_LOCAL_ID):
                     # Extract voltage (usually 1 byte representing voltage in 0.1V)
                     voltage_raw = response[2]
                     self.battery_voltage = voltage_raw / 10.0
@@ -664,18 +1115,16 @@ class BMWFlasher:
     
     def disconnect(self):
         """Disconnect from the ECU."""
-        if self.watchdog_timer:
-            self.watchdog_timer.cancel()
-            self.watchdog_timer = None
+        self._stop_watchdog()
             
         if self.port and self.port.is_open:
             # Return to default session if needed
             if self.session_type != SESSION_DEFAULT:
                 try:
-                    if self.protocol == "UDS":
-                        self._send_uds_command(UDS_DIAGNOSTIC_SESSION_CONTROL, [SESSION_DEFAULT])
+                    if self.protocol == PROTOCOL_UDS:
+                        self._send_uds_command(UDS_DIAGNOSTIC_SESSION_CONTROL, bytes([SESSION_DEFAULT]))
                     else:
-                        self._send_kwp_command(KWP_START_DIAGNOSTIC_SESSION, [0x81])  # Default for BMW
+                        self._send_kwp_command(KWP_START_DIAGNOSTIC_SESSION, b'\x81')  # Default for BMW
                 except:
                     pass
                     
@@ -696,65 +1145,62 @@ class BMWFlasher:
         ecu_info = {}
         
         # Read VIN
-        if self.protocol == "KWP2000":
+        if self.protocol == PROTOCOL_KWP2000:
             # KWP2000 ECU identification
-            response = self._send_kwp_command(KWP_READ_ECU_IDENTIFICATION, [0x90])  # VIN
-            if response and response[0] == KWP_READ_ECU_IDENTIFICATION + POSITIVE_RESPONSE:
+            response = self._send_kwp_command(KWP_READ_ECU_IDENTIFICATION, b'\x90')  # VIN
+            if is_positive_response(response, KWP_READ_ECU_IDENTIFICATION):
                 self.vin = response[2:].decode('ascii', errors='ignore').strip('\x00')
                 ecu_info['vin'] = self.vin
                 
             # Read ECU ID
-            response = self._send_kwp_command(KWP_READ_ECU_IDENTIFICATION, [0x92])  # ECU ID
-            if response and response[0] == KWP_READ_ECU_IDENTIFICATION + POSITIVE_RESPONSE:
+            response = self._send_kwp_command(KWP_READ_ECU_IDENTIFICATION, b'\x92')  # ECU ID
+            if is_positive_response(response, KWP_READ_ECU_IDENTIFICATION):
                 self.ecu_id = response[2:].decode('ascii', errors='ignore').strip('\x00')
                 ecu_info['ecu_id'] = self.ecu_id
                 
             # Read Software Version
-            response = self._send_kwp_command(KWP_READ_ECU_IDENTIFICATION, [0x94])  # SW Version
-            if response and response[0] == KWP_READ_ECU_IDENTIFICATION + POSITIVE_RESPONSE:
+            response = self._send_kwp_command(KWP_READ_ECU_IDENTIFICATION, b'\x94')  # SW Version
+            if is_positive_response(response, KWP_READ_ECU_IDENTIFICATION):
                 self.sw_version = response[2:].decode('ascii', errors='ignore').strip('\x00')
                 ecu_info['sw_version'] = self.sw_version
                 
             # Read Hardware Version
-            response = self._send_kwp_command(KWP_READ_ECU_IDENTIFICATION, [0x93])  # HW Version
-            if response and response[0] == KWP_READ_ECU_IDENTIFICATION + POSITIVE_RESPONSE:
+            response = self._send_kwp_command(KWP_READ_ECU_IDENTIFICATION, b'\x93')  # HW Version
+            if is_positive_response(response, KWP_READ_ECU_IDENTIFICATION):
                 self.hw_version = response[2:].decode('ascii', errors='ignore').strip('\x00')
                 ecu_info['hw_version'] = self.hw_version
                 
         else:  # UDS
-            # UDS Read Data By Identifier
-            # VIN is typically DID 0xF190
-            response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, [0xF1, 0x90])
-            if response and response[0] == UDS_READ_DATA_BY_IDENTIFIER + POSITIVE_RESPONSE:
-                self.vin = response[3:].decode('ascii', errors='ignore').strip('\x00')
-                ecu_info['vin'] = self.vin
-                
-            # ECU ID is typically DID 0xF18A
-            response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, [0xF1, 0x8A])
-            if response and response[0] == UDS_READ_DATA_BY_IDENTIFIER + POSITIVE_RESPONSE:
-                self.ecu_id = response[3:].decode('ascii', errors='ignore').strip('\x00')
-                ecu_info['ecu_id'] = self.ecu_id
-                
-            # Software Version is typically DID 0xF189
-            response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, [0xF1, 0x89])
-            if response and response[0] == UDS_READ_DATA_BY_IDENTIFIER + POSITIVE_RESPONSE:
-                self.sw_version = response[3:].decode('ascii', errors='ignore').strip('\x00')
-                ecu_info['sw_version'] = self.sw_version
-                
-            # Hardware Version is typically DID 0xF191
-            response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, [0xF1, 0x91])
-            if response and response[0] == UDS_READ_DATA_BY_IDENTIFIER + POSITIVE_RESPONSE:
-                self.hw_version = response[3:].decode('ascii', errors='ignore').strip('\x00')
-                ecu_info['hw_version'] = self.hw_version
+            # Read VIN (0xF190), ECU ID (0xF18A), SW (0xF189) and HW (0xF191) versions in one request
+            tags = [tag for tag, _ in ECU_INFO_DIDS]
+            response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, b''.join(tags))
+            if is_positive_response(response, UDS_READ_DATA_BY_IDENTIFIER):
+                records = split_did_records(bytes(response[1:]), tags)
+            else:
+                # ECUs that take one DID per request reject the combined read (NRC 0x13)
+                records = {}
+                for tag in tags:
+                    response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, tag)
+                    if is_positive_response(response, UDS_READ_DATA_BY_IDENTIFIER):
+                        records[tag] = response[3:]
+                        
+            for tag, key in ECU_INFO_DIDS:
+                if tag in records:
+                    value = records[tag].decode('ascii', errors='ignore').strip('\x00')
+                    setattr(self, key, value)
+                    ecu_info[key] = value
         
-        # Determine ECU type from ECU ID
+        # Determine ECU type from ECU ID, unless it was already derived from this ID
         if self.ecu_id:
-            self.ecu_type = self._determine_ecu_type(self.ecu_id)
+            if self.ecu_id != self.ecu_type_source_id:
+                self.ecu_type = self._determine_ecu_type(self.ecu_id)
+                
+                # Get memory map for this ECU type
+                self.ecu_memory_map = self._get_memory_map(self.ecu_type)
+                self.ecu_type_source_id = self.ecu_id
+                
             ecu_info['ecu_type'] = self.ecu_type
             
-            # Get memory map for this ECU type
-            self.ecu_memory_map = self._get_memory_map(self.ecu_type)
-            
         # Check if we're in bootloader mode
         self.in_bootloader = self._check_bootloader_mode()
         ecu_info['in_bootloader'] = self.in_bootloader
@@ -768,22 +1214,9 @@ class BMWFlasher:
         """Determine the ECU type from the ECU ID."""
         ecu_id = ecu_id.upper()
         
-        # Common BMW ECU types
-        if "MSD80" in ecu_id:
-            return "MSD80"
-        elif "MSD81" in ecu_id:
-            return "MSD81"
-        elif "MEVD17.2" in ecu_id:
-            return "MEVD17.2"
-        elif "MG1" in ecu_id:
-            return "MG1"
-        elif "MD1" in ecu_id:
-            return "MD1"
-        
-        # If we can't determine the exact type, try to match partially
-        for ecu_type in ECU_MEMORY_MAPS.keys():
-            if ecu_type in ecu_id:
-                return ecu_type
+        match = ECU_TYPE_PATTERN.search(ecu_id)
+        if match:
+            return match.group(0)
                 
         # Default to MSD80 if we can't determine the type
         logger.warning(f"Could not determine ECU type from ID: {ecu_id}, defaulting to MSD80")
@@ -798,17 +1231,17 @@ class BMWFlasher:
         # Different ECUs have different ways to check bootloader mode
         # This is a simplified implementation
         
-        if self.protocol == "KWP2000":
+        if self.protocol == PROTOCOL_KWP2000:
             # In KWP2000, we can check by reading a specific local ID
-            response = self._send_kwp_command(KWP_READ_DATA_BY_LOCAL_ID, [0x01])  # Status
-            if response and response[0] == KWP_READ_DATA_BY_LOCAL_ID + POSITIVE_RESPONSE:
+            response = self._send_kwp_command(KWP_READ_DATA_BY_LOCAL_ID, b'\x01')  # Status
+            if is_positive_response(response, KWP_READ_DATA_BY_LOCAL_ID):
                 # Check status byte (this is ECU-specific)
                 if len(response) > 2 and (response[2] & 0x80):  # Bit 7 set = bootloader
                     return True
         else:  # UDS
             # In UDS, we can check by reading a specific DID
-            response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, [0xF1, 0x80])  # Boot Software ID
-            if response and response[0] == UDS_READ_DATA_BY_IDENTIFIER + POSITIVE_RESPONSE:
+            response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, b'\xF1\x80')  # Boot Software ID
+            if is_positive_response(response, UDS_READ_DATA_BY_IDENTIFIER):
                 # If we can read the boot software ID, we're likely in bootloader mode
                 return True
                 
@@ -823,10 +1256,10 @@ class BMWFlasher:
             
         logger.info("Entering programming session...")
         
-        if self.protocol == "KWP2000":
+        if self.protocol == PROTOCOL_KWP2000:
             # KWP2000 programming session
-            response = self._send_kwp_command(KWP_START_DIAGNOSTIC_SESSION, [0x85])  # Programming session
-            if not response or response[0] != KWP_START_DIAGNOSTIC_SESSION + POSITIVE_RESPONSE:
+            response = self._send_kwp_command(KWP_START_DIAGNOSTIC_SESSION, b'\x85')  # Programming session
+            if not is_positive_response(response, KWP_START_DIAGNOSTIC_SESSION):
                 logger.error("Failed to enter programming session")
                 return False
                 
@@ -836,8 +1269,8 @@ class BMWFlasher:
             
         else:  # UDS
             # UDS programming session
-            response = self._send_uds_command(UDS_DIAGNOSTIC_SESSION_CONTROL, [SESSION_PROGRAMMING])
-            if not response or response[0] != UDS_DIAGNOSTIC_SESSION_CONTROL + POSITIVE_RESPONSE:
+            response = self._send_uds_command(UDS_DIAGNOSTIC_SESSION_CONTROL, bytes([SESSION_PROGRAMMING]))
+            if not is_positive_response(response, UDS_DIAGNOSTIC_SESSION_CONTROL):
                 logger.error("Failed to enter programming session")
                 return False
                 
@@ -865,11 +1298,11 @@ class BMWFlasher:
         security_algorithm = self.ecu_memory_map.get("security_algorithm", "xor")
         seed_key_length = self.ecu_memory_map.get("seed_key_length", 2)
         
-        if self.protocol == "KWP2000":
+        if self.protocol == PROTOCOL_KWP2000:
             # KWP2000 security access
             # Request seed
-            response = self._send_kwp_command(KWP_SECURITY_ACCESS, [0x01])  # Request seed
-            if not response or response[0] != KWP_SECURITY_ACCESS + POSITIVE_RESPONSE:
+            response = self._send_kwp_command(KWP_SECURITY_ACCESS, b'\x01')  # Request seed
+            if not is_positive_response(response, KWP_SECURITY_ACCESS):
                 logger.error("Failed to request seed")
                 return False
                 
@@ -884,8 +1317,8 @@ class BMWFlasher:
             
             # Send key
             key_bytes = key.to_bytes(seed_key_length, byteorder='big')
-            response = self._send_kwp_command(KWP_SECURITY_ACCESS, [0x02] + list(key_bytes))
-            if not response or response[0] != KWP_SECURITY_ACCESS + POSITIVE_RESPONSE:
+            response = self._send_kwp_command(KWP_SECURITY_ACCESS, b'\x02' + key_bytes)
+            if not is_positive_response(response, KWP_SECURITY_ACCESS):
                 logger.error("Security access denied")
                 return False
                 
@@ -896,8 +1329,8 @@ class BMWFlasher:
         else:  # UDS
             # UDS security access
             # Request seed
-            response = self._send_uds_command(UDS_SECURITY_ACCESS, [0x01])  # Request seed
-            if not response or response[0] != UDS_SECURITY_ACCESS + POSITIVE_RESPONSE:
+            response = self._send_uds_command(UDS_SECURITY_ACCESS, b'\x01')  # Request seed
+            if not is_positive_response(response, UDS_SECURITY_ACCESS):
                 logger.error("Failed to request seed")
                 return False
                 
@@ -912,8 +1345,8 @@ class BMWFlasher:
             
             # Send key
             key_bytes = key.to_bytes(seed_key_length, byteorder='big')
-            response = self._send_uds_command(UDS_SECURITY_ACCESS, [0x02] + list(key_bytes))
-            if not response or response[0] != UDS_SECURITY_ACCESS + POSITIVE_RESPONSE:
+            response = self._send_uds_command(UDS_SECURITY_ACCESS, b'\x02' + key_bytes)
+            if not is_positive_response(response, UDS_SECURITY_ACCESS):
                 logger.error("Security access denied")
                 return False
                 
@@ -929,13 +1362,12 @@ class BMWFlasher:
             return key
             
         elif algorithm == "crc":
-           
-            key = seed
-            for i in range(32):  # 32-bit CRC
-                if key & 0x80000000:
-                    key = ((key << 1) ^ 0x4C11DB7) & 0xFFFFFFFF
-                else:
-                    key = (key << 1) & 0xFFFFFFFF
+            # CRC-32 (poly 0x04C11DB7, MSB-first, no init/xorout) over the 4 seed bytes.
+            # binascii.crc32 implements the bit-reflected variant with init/xorout 0xFFFFFFFF,
+            # so reflect the input and output and cancel the init/xorout to get the same key.
+            seed_bytes = seed.to_bytes(4, byteorder='big').translate(BIT_REVERSE_TABLE)
+            crc = binascii.crc32(seed_bytes, 0xFFFFFFFF) ^ 0xFFFFFFFF
+            key = int.from_bytes(crc.to_bytes(4, byteorder='little').translate(BIT_REVERSE_TABLE), byteorder='big')
             return key
             
         else:
@@ -973,82 +1405,107 @@ class BMWFlasher:
             
         logger.info(f"Starting ECU backup to {backup_filename}")
         
-        # Open the backup file
+        # Open the backup file; blocks are written from a separate thread so
+        # disk I/O overlaps with waiting for the next ECU response
         with open(backup_filename, 'wb') as backup_file:
-            # Calculate total size for progress reporting
-            total_size = sum(sector["size"] for sector in self.ecu_memory_map["sectors"])
-            bytes_read = 0
-            
-            # Read each sector
-            for sector in self.ecu_memory_map["sectors"]:
-                sector_start = sector["start"]
-                sector_size = sector["size"]
-                sector_name = sector["name"]
-                
-                logger.info(f"Backing up sector: {sector_name} ({sector_size/1024:.1f} KB)")
+            blocks = queue.Queue(BACKUP_WRITE_QUEUE_DEPTH)
+            write_errors = []
+            writer = threading.Thread(target=self._write_backup_blocks,
+                                      args=(backup_file, blocks, write_errors), daemon=True)
+            writer.start()
+            
+            try:
+                # Calculate total size for progress reporting
+                total_size = self.ecu_memory_map["total_size"]
+                bytes_read = 0
+                last_percent = -1
                 
-                # Read the sector in blocks
-                block_size = min(self.ecu_memory_map["transfer_size"], 0x1000)  # Max 4KB blocks
-                for offset in range(0, sector_size, block_size):
-                    address = sector_start + offset
-                    size = min(block_size, sector_size - offset)
+                # Read each sector
+                for sector in self.ecu_memory_map["sectors"]:
+                    sector_start = sector["start"]
+                    sector_size = sector["size"]
+                    sector_name = sector["name"]
                     
-                    # Read memory block
-                    block_data = self._read_memory(address, size)
-                    if not block_data:
-                        raise RuntimeError(f"Failed to read memory at 0x{address:X}")
-                        
-                    # Write to backup file
-                    backup_file.write(block_data)
+                    logger.info(f"Backing up sector: {sector_name} ({sector_size/1024:.1f} KB)")
                     
-                    # Update progress
-                    bytes_read += size
-                    if progress_callback:
-                        progress_callback(bytes_read / total_size * 100)
+                    # Read the sector in blocks
+                    block_size = self._get_read_block_size()
+                    for offset in range(0, sector_size, block_size):
+                        address = sector_start + offset
+                        size = min(block_size, sector_size - offset)
+                        
+                        # Read memory block
+                        block_data = self._read_memory(address, size)
+                        if not block_data:
+                            raise RuntimeError(f"Failed to read memory at 0x{address:X}")
+                            
+                        if write_errors:
+                            raise write_errors[0]
+                            
+                        # Hand off to the backup file writer
+                        blocks.put(block_data)
                         
-                    # Send tester present to keep the session alive
-                    if offset % 0x10000 == 0 and offset > 0:
-                        if self.protocol == "UDS":
-                            self._send_uds_command(UDS_TESTER_PRESENT, [0x00])
-                        else:
-                            self._send_kwp_command(KWP_TESTER_PRESENT, [0x00])
+                        # Update progress, only when the whole percentage changes
+                        bytes_read += size
+                        percent = bytes_read * 100 // total_size
+                        if progress_callback and percent != last_percent:
+                            progress_callback(percent)
+                            last_percent = percent
+            finally:
+                blocks.put(None)
+                writer.join()
+                
+            if write_errors:
+                raise write_errors[0]
         
         logger.info(f"ECU backup completed: {backup_filename}")
         return backup_filename
     
-    def _read_memory(self, address: int, size: int) -> Optional[bytes]:
-        """Read memory from the ECU."""
-        if self.protocol == "KWP2000":
-            # KWP2000 read memory by address
-            # Format: [address (4 bytes), size (1 byte)]
-            addr_bytes = address.to_bytes(4, byteorder='big')
-            response = self._send_kwp_command(KWP_READ_MEMORY_BY_ADDRESS, 
-                                             list(addr_bytes) + [size])
-            
-            if not response or response[0] != KWP_READ_MEMORY_BY_ADDRESS + POSITIVE_RESPONSE:
-                logger.error(f"Failed to read memory at 0x{address:X}")
-                return None
+    def _write_backup_blocks(self, backup_file, blocks: queue.Queue, errors: List[Exception]):
+        """Write queued backup blocks to the file until a None sentinel arrives."""
+        while True:
+            block_data = blocks.get()
+            if block_data is None:
+                return
+            if errors:
+                continue
+            try:
+                backup_file.write(block_data)
+            except OSError as e:
+                logger.error(f"Error writing backup file: {e}")
+                errors.append(e)
                 
-            # Extract data (skip service ID and address)
-            return response[6:]
-            
-        else:  # UDS
-            # UDS read memory by address
-            # Format: [address format (1 byte), address (variable), size format (1 byte), size (variable)]
-            addr_format = 0x24  # 4 bytes
-            addr_bytes = address.to_bytes(4, byteorder='big')
-            size_format = 0x11  # 1 byte
-            size_bytes = size.to_bytes(1, byteorder='big')
-            
-            response = self._send_uds_command(UDS_READ_MEMORY_BY_ADDRESS, 
-                                             [addr_format] + list(addr_bytes) + [size_format] + list(size_bytes))
+    def _read_memory_kwp(self, address: int, size: int, log_errors: bool = True) -> Optional[bytes]:
+        """Read memory from the ECU using KWP2000."""
+        # KWP2000 read memory by address
+        # Format: [address (4 bytes), size (1 byte)]
+        response = self._send_kwp_command(KWP_READ_MEMORY_BY_ADDRESS, 
+                                         KWP_READ_MEMORY_REQUEST.pack(address, size))
+        
+        if not is_positive_response(response, KWP_READ_MEMORY_BY_ADDRESS):
+            if log_errors:
+                logger.error(f"Failed to read memory at 0x{address:X}")
+            return None
             
-            if not response or response[0] != UDS_READ_MEMORY_BY_ADDRESS + POSITIVE_RESPONSE:
+        # Extract data (skip service ID and address)
+        return response[6:]
+    
+    def _read_memory_uds(self, address: int, size: int, log_errors: bool = True) -> Optional[bytes]:
+        """Read memory from the ECU using UDS."""
+        # UDS read memory by address
+        # Format: [address and length format (1 byte), address (4 bytes), size (2 bytes)]
+        addr_len_format = 0x24  # 2-byte size, 4-byte address
+        
+        response = self._send_uds_command(UDS_READ_MEMORY_BY_ADDRESS, 
+                                         UDS_READ_MEMORY_REQUEST.pack(addr_len_format, address, size))
+        
+        if not is_positive_response(response, UDS_READ_MEMORY_BY_ADDRESS):
+            if log_errors:
                 logger.error(f"Failed to read memory at 0x{address:X}")
-                return None
-                
-            # Extract data (skip service ID)
-            return response[1:]
+            return None
+            
+        # Extract data (skip service ID)
+        return response[1:]
     
     def flash_ecu(self, flash_file: str, progress_callback: Callable = None) -> bool:
         """Flash the ECU with the specified file."""
@@ -1073,96 +1530,99 @@ class BMWFlasher:
             
         logger.info(f"Starting ECU flash with file: {flash_file}")
         
-        # Read the flash file
+        # Map the flash file instead of reading it into memory; blocks are views into the mapping
         with open(flash_file, 'rb') as f:
-            flash_data = f.read()
-            
-        # Verify file size
-        if len(flash_data) > self.ecu_memory_map["flash_size"]:
-            raise ValueError(f"Flash file too large: {len(flash_data)} bytes, max: {self.ecu_memory_map['flash_size']} bytes")
-            
-        # Calculate total size for progress reporting
-        total_size = len(flash_data)
-        bytes_written = 0
+            file_size = os.fstat(f.fileno()).st_size
+            if file_size == 0:
+                raise ValueError("Flash file is empty")
+                
+            # Verify file size
+            if file_size > self.ecu_memory_map["flash_size"]:
+                raise ValueError(f"Flash file too large: {file_size} bytes, max: {self.ecu_memory_map['flash_size']} bytes")
+                
+            # Work out once which sectors the file covers, shared by the write and verify passes
+            plan = self._plan_flash(file_size)
+            
+            # The mapping is not closed explicitly: an exception's traceback can still hold
+            # block views, and closing would then fail and hide that exception. It is
+            # unmapped as soon as the last view is released.
+            flash_data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            self._write_flash(flash_data, plan, progress_callback)
+            
+            # Verify the flash
+            logger.info("Verifying flash...")
+            if not self._verify_flash(flash_data, plan, progress_callback):
+                raise RuntimeError("Flash verification failed")
+                    
+        logger.info("ECU flash completed successfully")
+        return True
         
-        # Flash each sector
+    def _plan_flash(self, data_size: int) -> List[Tuple[Dict, int]]:
+        """Return (sector, offset in the flash data) for every writable sector the data covers."""
+        plan = []
         for sector in self.ecu_memory_map["sectors"]:
-            sector_start = sector["start"]
-            sector_size = sector["size"]
-            sector_name = sector["name"]
-            protected = sector.get("protected", False)
-            
             # Skip protected sectors
-            if protected:
-                logger.info(f"Skipping protected sector: {sector_name}")
+            if sector.get("protected", False):
+                logger.info(f"Skipping protected sector: {sector['name']}")
                 continue
                 
             # Calculate sector range in flash data
-            data_start = sector_start - self.ecu_memory_map["flash_start"]
-            data_end = data_start + sector_size
+            data_start = sector["start"] - self.ecu_memory_map["flash_start"]
             
             # Skip if this sector is not in the flash data
-            if data_start >= len(flash_data):
-                logger.info(f"Skipping sector outside flash data: {sector_name}")
+            if data_start < 0 or data_start >= data_size:
+                logger.info(f"Skipping sector outside flash data: {sector['name']}")
                 continue
                 
-            # Get the data for this sector
-            sector_data = flash_data[data_start:min(data_end, len(flash_data))]
-            
-            # If the sector data is smaller than the sector, pad with 0xFF
-            if len(sector_data) < sector_size:
-                sector_data += b'\xFF' * (sector_size - len(sector_data))
+            plan.append((sector, data_start))
+        return plan
+        
+    def _write_flash(self, flash_data: bytes, plan: List[Tuple[Dict, int]], progress_callback: Callable = None):
+        """Erase and write the planned sectors."""
+        # Calculate total size for progress reporting
+        total_size = len(flash_data)
+        bytes_written = 0
+        last_percent = -1
+        
+        def report_progress(size: int):
+            # Update progress, only when the whole percentage changes
+            nonlocal bytes_written, last_percent
+            bytes_written += size
+            percent = bytes_written * 100 // total_size
+            if progress_callback and percent != last_percent:
+                progress_callback(percent)
+                last_percent = percent
                 
-            logger.info(f"Flashing sector: {sector_name} ({len(sector_data)/1024:.1f} KB)")
+        # Flash each sector
+        for sector, data_start in plan:
+            sector_start = sector["start"]
+            sector_size = sector["size"]
+            sector_name = sector["name"]
+            
+            logger.info(f"Flashing sector: {sector_name} ({sector_size/1024:.1f} KB)")
             
             # Erase the sector first if required
             if self.ecu_memory_map.get("erase_required", True):
                 if not self._erase_memory_sector(sector_start, sector_size):
                     raise RuntimeError(f"Failed to erase sector: {sector_name}")
                     
-            # Flash the sector in blocks
-            block_size = self.ecu_memory_map.get("transfer_size", 0x200)  # Default 512 bytes
-            for offset in range(0, len(sector_data), block_size):
-                address = sector_start + offset
-                block = sector_data[offset:offset+block_size]
-                
-                # Write memory block
-                if not self._write_memory(address, block):
-                    raise RuntimeError(f"Failed to write memory at 0x{address:X}")
-                    
-                # Update progress
-                bytes_written += len(block)
-                if progress_callback:
-                    progress_callback(bytes_written / total_size * 100)
-                    
-                # Send tester present to keep the session alive
-                if offset % 0x10000 == 0 and offset > 0:
-                    if self.protocol == "UDS":
-                        self._send_uds_command(UDS_TESTER_PRESENT, [0x00])
-                    else:
-                        self._send_kwp_command(KWP_TESTER_PRESENT, [0x00])
-        
-        # Verify the flash
-        logger.info("Verifying flash...")
-        if not self._verify_flash(flash_data, progress_callback):
-            raise RuntimeError("Flash verification failed")
-            
-        logger.info("ECU flash completed successfully")
-        return True
+            # Write the whole sector in one go, padding past the end of the flash data with 0xFF;
+            # the protocol writer splits it into transfer blocks
+            sector_data = flash_block(flash_data, data_start, sector_size)
+            if not self._write_memory(sector_start, sector_data, report_progress):
+                raise RuntimeError(f"Failed to write sector: {sector_name}")
     
     def _erase_memory_sector(self, address: int, size: int) -> bool:
         """Erase a memory sector in the ECU."""
         logger.info(f"Erasing memory sector at 0x{address:X}, size: 0x{size:X}")
         
-        if self.protocol == "KWP2000":
+        if self.protocol == PROTOCOL_KWP2000:
             # KWP2000 typically uses a routine control for erasing
             # Format depends on the ECU, but typically: [routine ID (2 bytes), address (4 bytes), size (4 bytes)]
             routine_id = 0x00  # Erase routine
-            addr_bytes = address.to_bytes(4, byteorder='big')
-            size_bytes = size.to_bytes(4, byteorder='big')
             
-            response = self._send_kwp_command(0x31, [routine_id] + list(addr_bytes) + list(size_bytes))
-            if not response or response[0] != 0x31 + POSITIVE_RESPONSE:
+            response = self._send_kwp_command(0x31, KWP_ERASE_MEMORY_REQUEST.pack(routine_id, address, size))
+            if not is_positive_response(response, 0x31):
                 logger.error(f"Failed to erase memory sector at 0x{address:X}")
                 return False
                 
@@ -1172,130 +1632,136 @@ class BMWFlasher:
             # UDS uses routine control for erasing
             # Format: [routine control type (1 byte), routine ID (2 bytes), parameters]
             routine_control_type = 0x01  # Start routine
-            routine_id_bytes = ROUTINE_ERASE_MEMORY_SECTOR.to_bytes(2, byteorder='big')
-            addr_bytes = address.to_bytes(4, byteorder='big')
-            size_bytes = size.to_bytes(4, byteorder='big')
             
             response = self._send_uds_command(UDS_ROUTINE_CONTROL, 
-                                             [routine_control_type] + list(routine_id_bytes) + 
-                                             list(addr_bytes) + list(size_bytes))
+                                             UDS_ERASE_MEMORY_REQUEST.pack(routine_control_type, ROUTINE_ERASE_MEMORY_SECTOR,
+                                                                           address, size))
             
-            if not response or response[0] != UDS_ROUTINE_CONTROL + POSITIVE_RESPONSE:
+            if not is_positive_response(response, UDS_ROUTINE_CONTROL):
                 logger.error(f"Failed to erase memory sector at 0x{address:X}")
                 return False
                 
             return True
     
-    def _write_memory(self, address: int, data: bytes) -> bool:
-        """Write data to ECU memory."""
-        if self.protocol == "KWP2000":
+    def _write_memory(self, address: int, data: bytes, progress: Callable = None) -> bool:
+        """Write data to ECU memory, calling progress with the size of each block written."""
+        # Never write outside a known, unprotected sector
+        sector = find_sector(self.ecu_memory_map, address)
+        if not sector or sector.get("protected", False) or address + len(data) > sector["start"] + sector["size"]:
+            logger.error(f"Refusing to write to protected or unmapped memory at 0x{address:X}")
+            return False
+            
+        return self._write_memory_block(address, data, progress)
+    
+    def _write_memory_kwp(self, address: int, data: bytes, progress: Callable = None) -> bool:
+        """Write data to ECU memory using KWP2000, one request per transfer block."""
+        block_size = self.ecu_memory_map.get("transfer_size", 0x200)  # Default 512 bytes
+        data_view = memoryview(data)
+        
+        for offset in range(0, len(data), block_size):
+            block = data_view[offset:offset+block_size]
+            
             # KWP2000 write memory by address
             # Format: [address (4 bytes), data]
-            addr_bytes = address.to_bytes(4, byteorder='big')
-            
             response = self._send_kwp_command(KWP_WRITE_MEMORY_BY_ADDRESS, 
-                                             list(addr_bytes) + list(data))
+                                             KWP_WRITE_MEMORY_REQUEST.pack(address + offset) + block)
             
-            if not response or response[0] != KWP_WRITE_MEMORY_BY_ADDRESS + POSITIVE_RESPONSE:
-                logger.error(f"Failed to write memory at 0x{address:X}")
+            if not is_positive_response(response, KWP_WRITE_MEMORY_BY_ADDRESS):
+                logger.error(f"Failed to write memory at 0x{address+offset:X}")
                 return False
                 
-            return True
-            
-        else:  # UDS
-            # UDS has two methods: write memory by address or request download + transfer data
-            # We'll use request download + transfer data for larger blocks
-            
-            # Request download
-            # Format: [data format (1 byte), address format (1 byte), address (variable), size format (1 byte), size (variable)]
-            data_format = 0x00  # Default format
-            addr_format = 0x24  # 4 bytes
-            addr_bytes = address.to_bytes(4, byteorder='big')
-            size_format = 0x24  # 4 bytes
-            size_bytes = len(data).to_bytes(4, byteorder='big')
-            
-            response = self._send_uds_command(UDS_REQUEST_DOWNLOAD, 
-                                             [data_format, addr_format] + list(addr_bytes) + 
-                                             [size_format] + list(size_bytes))
-            
-            if not response or response[0] != UDS_REQUEST_DOWNLOAD + POSITIVE_RESPONSE:
-                logger.error(f"Failed to request download at 0x{address:X}")
-                return False
+            if progress:
+                progress(len(block))
                 
-            # Extract max block size and block sequence counter
-            max_block_size = 0
-            if len(response) >= 3:
-                max_block_size = int.from_bytes(response[2:], byteorder='big')
-                
-            # Use the smaller of our block size and the ECU's max block size
-            block_size = min(len(data), max_block_size if max_block_size > 0 else len(data))
+        return True
+    
+    def _write_memory_uds(self, address: int, data: bytes, progress: Callable = None) -> bool:
+        """Write data to ECU memory using one UDS request download and a transfer data per block."""
+        # UDS has two methods: write memory by address or request download + transfer data
+        # We'll use request download + transfer data for larger blocks
+        
+        # Request download
+        # Format: [data format (1 byte), address format (1 byte), address (variable), size format (1 byte), size (variable)]
+        data_format = 0x00  # Default format
+        addr_format = 0x24  # 4 bytes
+        size_format = 0x24  # 4 bytes
+        
+        response = self._send_uds_command(UDS_REQUEST_DOWNLOAD, 
+                                         UDS_REQUEST_DOWNLOAD_REQUEST.pack(data_format, addr_format, address,
+                                                                           size_format, len(data)))
+        
+        if not is_positive_response(response, UDS_REQUEST_DOWNLOAD):
+            logger.error(f"Failed to request download at 0x{address:X}")
+            return False
             
-            # Transfer data
-            # Format: [block sequence counter (1 byte), data]
-            block_sequence_counter = 1
+        # Extract max block size (length format in the high nibble of byte 1)
+        max_block_size = 0
+        if len(response) >= 3:
+            max_block_size = int.from_bytes(response[2:2+(response[1] >> 4)], byteorder='big')
             
-            for i in range(0, len(data), block_size):
-                block = data[i:i+block_size]
-                
-                response = self._send_uds_command(UDS_TRANSFER_DATA, 
-                                                [block_sequence_counter] + list(block))
-                
-                if not response or response[0] != UDS_TRANSFER_DATA + POSITIVE_RESPONSE:
-                    logger.error(f"Failed to transfer data block {block_sequence_counter} at 0x{address+i:X}")
-                    return False
-                    
-                block_sequence_counter = (block_sequence_counter + 1) & 0xFF
-                
-            # Request transfer exit
-            response = self._send_uds_command(UDS_REQUEST_TRANSFER_EXIT, [])
+        # The ECU's max block size counts the whole transfer data request including SID and
+        # sequence counter; without one fall back to the memory map's transfer size
+        if max_block_size > 2:
+            block_size = min(max_block_size, ISOTP_MAX_MESSAGE_SIZE) - 2
+        else:
+            block_size = self.ecu_memory_map.get("transfer_size", 0x200)
+        block_size = min(block_size, len(data))
+        
+        # Transfer data
+        # Format: [block sequence counter (1 byte), data]
+        block_sequence_counter = 1
+        
+        # Build every request in one buffer, copying the data straight out of the source
+        data_view = memoryview(data)
+        tx_buf = bytearray(1 + block_size)
+        tx_view = memoryview(tx_buf)
+        
+        for i in range(0, len(data), block_size):
+            block = data_view[i:i+block_size]
+            tx_buf[0] = block_sequence_counter
+            tx_buf[1:1+len(block)] = block
             
-            if not response or response[0] != UDS_REQUEST_TRANSFER_EXIT + POSITIVE_RESPONSE:
-                logger.error("Failed to exit transfer")
+            response = self._send_uds_command(UDS_TRANSFER_DATA, tx_view[:1+len(block)])
+            
+            if not is_positive_response(response, UDS_TRANSFER_DATA):
+                logger.error(f"Failed to transfer data block {block_sequence_counter} at 0x{address+i:X}")
                 return False
                 
-            return True
+            if progress:
+                progress(len(block))
+                
+            block_sequence_counter = (block_sequence_counter + 1) & 0xFF
+            
+        # Request transfer exit
+        response = self._send_uds_command(UDS_REQUEST_TRANSFER_EXIT, b'')
+        
+        if not is_positive_response(response, UDS_REQUEST_TRANSFER_EXIT):
+            logger.error("Failed to exit transfer")
+            return False
+            
+        return True
     
-    def _verify_flash(self, flash_data: bytes, progress_callback: Callable = None) -> bool:
-        """Verify that the ECU flash matches the provided data."""
+    def _verify_flash(self, flash_data: bytes, plan: List[Tuple[Dict, int]],
+                      progress_callback: Callable = None) -> bool:
+        """Verify that the planned sectors of the ECU flash match the provided data."""
         # Calculate total size for progress reporting
         total_size = len(flash_data)
         bytes_verified = 0
+        last_percent = -1
         
         # Verify each sector
-        for sector in self.ecu_memory_map["sectors"]:
+        for sector, data_start in plan:
             sector_start = sector["start"]
             sector_size = sector["size"]
             sector_name = sector["name"]
-            protected = sector.get("protected", False)
-            
-            # Skip protected sectors
-            if protected:
-                logger.info(f"Skipping verification of protected sector: {sector_name}")
-                continue
-                
-            # Calculate sector range in flash data
-            data_start = sector_start - self.ecu_memory_map["flash_start"]
-            data_end = data_start + sector_size
-            
-            # Skip if this sector is not in the flash data
-            if data_start >= len(flash_data):
-                logger.info(f"Skipping verification of sector outside flash data: {sector_name}")
-                continue
-                
-            # Get the data for this sector
-            sector_data = flash_data[data_start:min(data_end, len(flash_data))]
             
-            # If the sector data is smaller than the sector, pad with 0xFF
-            if len(sector_data) < sector_size:
-                sector_data += b'\xFF' * (sector_size - len(sector_data))
-                
-            logger.info(f"Verifying sector: {sector_name} ({len(sector_data)/1024:.1f} KB)")
+            logger.info(f"Verifying sector: {sector_name} ({sector_size/1024:.1f} KB)")
             
-            # Read and verify the sector in blocks
-            block_size = min(self.ecu_memory_map.get("transfer_size", 0x200), 0x1000)  # Max 4KB blocks
-            for offset in range(0, len(sector_data), block_size):
+            # Read and verify the sector in blocks, padding past the end of the flash data with 0xFF
+            block_size = self._get_read_block_size()
+            for offset in range(0, sector_size, block_size):
                 address = sector_start + offset
-                expected_block = sector_data[offset:offset+block_size]
+                expected_block = flash_block(flash_data, data_start + offset, min(block_size, sector_size - offset))
                 
                 # Read memory block
                 actual_block = self._read_memory(address, len(expected_block))
@@ -1308,17 +1774,12 @@ class BMWFlasher:
                     logger.error(f"Verification failed at 0x{address:X}: data mismatch")
                     return False
                     
-                # Update progress
+                # Update progress, only when the whole percentage changes
                 bytes_verified += len(expected_block)
-                if progress_callback:
-                    progress_callback(bytes_verified / total_size * 100)
-                    
-                # Send tester present to keep the session alive
-                if offset % 0x10000 == 0 and offset > 0:
-                    if self.protocol == "UDS":
-                        self._send_uds_command(UDS_TESTER_PRESENT, [0x00])
-                    else:
-                        self._send_kwp_command(KWP_TESTER_PRESENT, [0x00])
+                percent = bytes_verified * 100 // total_size
+                if progress_callback and percent != last_percent:
+                    progress_callback(percent)
+                    last_percent = percent
         
         logger.info("Flash verification completed successfully")
         return True
@@ -1327,15 +1788,15 @@ class BMWFlasher:
         """Reset the ECU."""
         logger.info("Resetting ECU...")
         
-        if self.protocol == "KWP2000":
+        if self.protocol == PROTOCOL_KWP2000:
             # KWP2000 ECU reset
-            response = self._send_kwp_command(KWP_ECU_RESET, [0x01])  # Hard reset
+            response = self._send_kwp_command(KWP_ECU_RESET, b'\x01')  # Hard reset
             # We don't expect a response since the ECU will reset
             return True
             
         else:  # UDS
             # UDS ECU reset
-            response = self._send_uds_command(UDS_ECU_RESET, [0x01])  # Hard reset
+            response = self._send_uds_command(UDS_ECU_RESET, b'\x01')  # Hard reset
             # We don't expect a response since the ECU will reset
             return True
     
@@ -1346,65 +1807,42 @@ class BMWFlasher:
             
         dtcs = []
         
-        if self.protocol == "KWP2000":
+        if self.protocol == PROTOCOL_KWP2000:
             # KWP2000 read DTCs by status
-            response = self._send_kwp_command(KWP_READ_DTC_BY_STATUS, [0x00])  # All DTCs
-            if not response or response[0] != KWP_READ_DTC_BY_STATUS + POSITIVE_RESPONSE:
+            response = self._send_kwp_command(KWP_READ_DTC_BY_STATUS, b'\x00')  # All DTCs
+            if not is_positive_response(response, KWP_READ_DTC_BY_STATUS):
                 logger.error("Failed to read DTCs")
                 return dtcs
                 
             # Parse DTCs
-            # Format: [status byte, DTC high byte, DTC low byte] repeated
-            for i in range(2, len(response), 3):
-                if i + 2 < len(response):
-                    status = response[i]
-                    dtc_high = response[i+1]
-                    dtc_low = response[i+2]
-                    
-                    dtc_code = (dtc_high << 8) | dtc_low
-                    dtc_text = f"P{dtc_code:04X}"
-                    
-                    dtcs.append({
-                        "code": dtc_code,
-                        "text": dtc_text,
-                        "status": status
-                    })
+            # Format: [status byte, DTC high byte, DTC low byte] repeated, a trailing partial record is ignored
+            record_count = (len(response) - 2) // KWP_DTC_RECORD.size
+            records = response[2:2 + record_count * KWP_DTC_RECORD.size]
+            for status, dtc_code in KWP_DTC_RECORD.iter_unpack(records):
+                dtcs.append({
+                    "code": dtc_code,
+                    "text": f"P{dtc_code:04X}",
+                    "status": status
+                })
                     
         else:  # UDS
             # UDS read DTCs
-            response = self._send_uds_command(UDS_READ_DTC, [0x02, 0xFF])  # All DTCs
-            if not response or response[0] != UDS_READ_DTC + POSITIVE_RESPONSE:
+            response = self._send_uds_command(UDS_READ_DTC, b'\x02\xFF')  # All DTCs
+            if not is_positive_response(response, UDS_READ_DTC):
                 logger.error("Failed to read DTCs")
                 return dtcs
                 
             # Parse DTCs
-            # Format: [DTC high byte, DTC mid byte, DTC low byte, status byte] repeated
-            for i in range(3, len(response), 4):
-                if i + 3 < len(response):
-                    dtc_high = response[i]
-                    dtc_mid = response[i+1]
-                    dtc_low = response[i+2]
-                    status = response[i+3]
-                    
-                    dtc_code = (dtc_high << 16) | (dtc_mid << 8) | dtc_low
-                    
-                    # Convert to standard OBD-II format
-                    if dtc_high & 0xC0 == 0x00:
-                        dtc_type = "P"  # Powertrain
-                    elif dtc_high & 0xC0 == 0x40:
-                        dtc_type = "C"  # Chassis
-                    elif dtc_high & 0xC0 == 0x80:
-                        dtc_type = "B"  # Body
-                    else:
-                        dtc_type = "U"  # Network
-                        
-                    dtc_text = f"{dtc_type}{dtc_high & 0x3F:X}{dtc_mid:02X}{dtc_low:02X}"
-                    
-                    dtcs.append({
-                        "code": dtc_code,
-                        "text": dtc_text,
-                        "status": status
-                    })
+            # Format: [DTC high byte, DTC mid byte, DTC low byte, status byte] repeated, a trailing partial record is ignored
+            record_count = (len(response) - 3) // UDS_DTC_RECORD.size
+            records = response[3:3 + record_count * UDS_DTC_RECORD.size]
+            for dtc_high, dtc_mid_low, status in UDS_DTC_RECORD.iter_unpack(records):
+                # Convert to standard OBD-II format
+                dtcs.append({
+                    "code": (dtc_high << 16) | dtc_mid_low,
+                    "text": f"{DTC_TYPE_LETTERS[dtc_high >> 6]}{dtc_high & 0x3F:X}{dtc_mid_low:04X}",
+                    "status": status
+                })
                     
         logger.info(f"Read {len(dtcs)} DTCs from ECU")
         return dtcs
@@ -1416,10 +1854,10 @@ class BMWFlasher:
             
         logger.info("Clearing DTCs...")
         
-        if self.protocol == "KWP2000":
+        if self.protocol == PROTOCOL_KWP2000:
             # KWP2000 clear DTCs
-            response = self._send_kwp_command(KWP_CLEAR_DIAGNOSTIC_INFORMATION, [0xFF, 0xFF, 0xFF])  # All DTCs
-            if not response or response[0] != KWP_CLEAR_DIAGNOSTIC_INFORMATION + POSITIVE_RESPONSE:
+            response = self._send_kwp_command(KWP_CLEAR_DIAGNOSTIC_INFORMATION, b'\xFF\xFF\xFF')  # All DTCs
+            if not is_positive_response(response, KWP_CLEAR_DIAGNOSTIC_INFORMATION):
                 logger.error("Failed to clear DTCs")
                 return False
                 
@@ -1428,8 +1866,8 @@ class BMWFlasher:
             
         else:  # UDS
             # UDS clear DTCs
-            response = self._send_uds_command(UDS_CLEAR_DTC, [0xFF, 0xFF, 0xFF])  # All DTCs
-            if not response or response[0] != UDS_CLEAR_DTC + POSITIVE_RESPONSE:
+            response = self._send_uds_command(UDS_CLEAR_DTC, b'\xFF\xFF\xFF')  # All DTCs
+            if not is_positive_response(response, UDS_CLEAR_DTC):
                 logger.error("Failed to clear DTCs")
                 return False
                 
@@ -1447,61 +1885,78 @@ class BMWFlasher:
             
         data = {}
         
-        if self.protocol == "KWP2000":
+        if self.protocol == PROTOCOL_KWP2000:
             # KWP2000 read data by local ID
             for pid in pids:
-                response = self._send_kwp_command(KWP_READ_DATA_BY_LOCAL_ID, [pid])
-                if response and response[0] == KWP_READ_DATA_BY_LOCAL_ID + POSITIVE_RESPONSE:
+                response = self._send_kwp_command(KWP_READ_DATA_BY_LOCAL_ID, bytes([pid]))
+                if is_positive_response(response, KWP_READ_DATA_BY_LOCAL_ID):
                     # Parse data based on PID
                     value = self._parse_live_data(pid, response[2:])
                     data[pid] = value
                     
         else:  # UDS
-            # UDS read data by identifier
-            for pid in pids:
-                # Convert OBD-II PID to UDS DID (typically 0xF400 + PID)
-                did = 0xF400 + pid
-                did_bytes = did.to_bytes(2, byteorder='big')
+            # Ask for every DID in one request and fall back to one request
+            # per DID for ECUs that reject multi-DID reads
+            data = self._read_live_data_uds(pids)
+            if data or len(pids) == 1:
+                return data
                 
-                response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, list(did_bytes))
-                if response and response[0] == UDS_READ_DATA_BY_IDENTIFIER + POSITIVE_RESPONSE:
+            for pid in pids:
+                response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, LIVE_DATA_DIDS[pid])
+                if is_positive_response(response, UDS_READ_DATA_BY_IDENTIFIER):
                     # Parse data based on PID
                     value = self._parse_live_data(pid, response[3:])
                     data[pid] = value
                     
         return data
     
+    def _read_live_data_uds(self, pids: List[int]) -> Dict:
+        """Read several PIDs with a single multi-DID ReadDataByIdentifier request."""
+        tags = [LIVE_DATA_DIDS[pid] for pid in pids]
+        response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, b''.join(tags))
+        if not is_positive_response(response, UDS_READ_DATA_BY_IDENTIFIER):
+            return {}
+            
+        min_lengths = [LIVE_DATA_DECODERS[pid][0] if pid in LIVE_DATA_DECODERS else 0 for pid in pids]
+        records = split_did_records(bytes(response[1:]), tags, min_lengths)
+        return {pid: self._parse_live_data(pid, records[tag])
+                for pid, tag in zip(pids, tags) if tag in records}
+    
+    def stream_live_data(self, n_samples: int, period: float, pids: List[int] = None) -> Iterator[Dict]:
+        """Yield live data samples at a fixed rate, counting the read time against the period."""
+        next_sample = time.monotonic()
+        for sample in range(n_samples):
+            if sample:
+                next_sample += period
+                delay = next_sample - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    # Fell behind, don't try to catch up with a burst of reads
+                    next_sample = time.monotonic()
+            yield self.read_live_data(pids)
+                
+    def read_live_data_samples(self, n_samples: int) -> Dict[str, array]:
+        """Read live data samples into one float32 array per parameter (NaN where unavailable)."""
+        pids = [pid for _, pid in LIVE_DATA_COLUMNS]
+        columns = {name: array('f', [float('nan')]) * n_samples for name, _ in LIVE_DATA_COLUMNS}
+        
+        for index in range(n_samples):
+            sample = self.read_live_data(pids)
+            for name, pid in LIVE_DATA_COLUMNS:
+                value = sample.get(pid)
+                if value and value["unit"] != "hex":
+                    columns[name][index] = value["value"]
+                    
+        return columns
+    
     def _parse_live_data(self, pid: int, data: bytes) -> Any:
         """Parse live data based on PID."""
-        if pid == 0x0C:  # RPM
-            if len(data) >= 2:
-                rpm = ((data[0] << 8) | data[1]) / 4
-                return {"value": rpm, "unit": "RPM"}
-                
-        elif pid == 0x0D:  # Speed
-            if len(data) >= 1:
-                speed = data[0]
-                return {"value": speed, "unit": "km/h"}
-                
-        elif pid == 0x0F:  # IAT (Intake Air Temperature)
-            if len(data) >= 1:
-                temp = data[0] - 40
-                return {"value": temp, "unit": "°C"}
-                
-        elif pid == 0x10:  # MAF (Mass Air Flow)
-            if len(data) >= 2:
-                maf = ((data[0] << 8) | data[1]) / 100
-                return {"value": maf, "unit": "g/s"}
-                
-        elif pid == 0x11:  # TPS (Throttle Position)
-            if len(data) >= 1:
-                tps = data[0] * 100 / 255
-                return {"value": tps, "unit": "%"}
-                
-        elif pid == 0x0B:  # MAP (Manifold Absolute Pressure)
-            if len(data) >= 1:
-                map_value = data[0]
-                return {"value": map_value, "unit": "kPa"}
+        decoder = LIVE_DATA_DECODERS.get(pid)
+        if decoder:
+            min_length, decode, unit = decoder
+            if len(data) >= min_length:
+                return {"value": decode(data), "unit": unit}
                 
         # Default case
         return {"value": data.hex(), "unit": "hex"}
@@ -1572,7 +2027,7 @@ def main():
                 print("No DTCs found")
             else:
                 for dtc in dtcs:
-                    status_str = bin(dtc['status'])[2:].zfill(8)
+                    status_str = DTC_STATUS_BITS[dtc['status']]
                     print(f"{dtc['text']} - Status: {status_str}")
                     
         elif args.clear_dtcs:
@@ -1583,12 +2038,10 @@ def main():
                 
         elif args.live_data:
             print("\nLive Data:")
-            for _ in range(10):  # Read 10 samples
-                data = flasher.read_live_data()
+            for data in flasher.stream_live_data(10, 0.5):  # Read 10 samples
                 print("\033[H\033[J")  # Clear screen
                 for pid, value in data.items():
                     print(f"PID 0x{pid:02X}: {value['value']} {value['unit']}")
-                time.sleep(0.5)
                 
         elif args.reset:
             if flasher.reset_ecu():
@@ -1607,4 +2060,4 @@ def main():
     return 0
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(main())
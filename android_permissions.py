@@ -8,8 +8,12 @@ from kivy.utils import platform
 
 logger = logging.getLogger('RFTX.Permissions')
 
+# Request code identifying our return from the all-files access settings screen
+MANAGE_STORAGE_REQUEST_CODE = 0x5246
+
 if platform == 'android':
     from android.permissions import request_permissions, check_permission, Permission
+    from android import activity as android_activity
     from jnius import autoclass
     
     # Android classes
@@ -18,6 +22,7 @@ if platform == 'android':
     Settings = autoclass('android.provider.Settings')
     Uri = autoclass('android.net.Uri')
     Build = autoclass('android.os.Build')
+    Environment = autoclass('android.os.Environment')
 
 
 class PermissionsManager:
@@ -82,20 +87,24 @@ class PermissionsManager:
             intent = Intent(Settings.ACTION_MANAGE_APP_ALL_FILES_ACCESS_PERMISSION)
             uri = Uri.parse(f"package:{activity.getPackageName()}")
             intent.setData(uri)
-            activity.startActivity(intent)
             
-            # Note: This is asynchronous, user must manually grant permission
-            logger.info("Opened settings for MANAGE_EXTERNAL_STORAGE permission")
-            
-            # Check permission after delay
+            # Note: This is asynchronous, user must manually grant permission;
+            # check it once they come back from the settings screen
             from kivy.clock import Clock
-            def check_delayed(dt):
+            def on_activity_result(request_code, result_code, data):
+                if request_code != MANAGE_STORAGE_REQUEST_CODE:
+                    return
+                android_activity.unbind(on_activity_result=on_activity_result)
                 granted = self._has_manage_storage_permission()
                 self.permissions_granted['storage'] = granted
+                logger.info(f"MANAGE_EXTERNAL_STORAGE: {'granted' if granted else 'denied'}")
                 if callback:
-                    callback(granted)
+                    # Runs on the Android UI thread, hand the result back to Kivy
+                    Clock.schedule_once(lambda dt: callback(granted))
                     
-            Clock.schedule_once(check_delayed, 3.0)
+            android_activity.bind(on_activity_result=on_activity_result)
+            activity.startActivityForResult(intent, MANAGE_STORAGE_REQUEST_CODE)
+            logger.info("Opened settings for MANAGE_EXTERNAL_STORAGE permission")
             
         except Exception as e:
             logger.error(f"Error requesting MANAGE_EXTERNAL_STORAGE: {e}")
@@ -105,7 +114,6 @@ class PermissionsManager:
     def _has_manage_storage_permission(self):
         """Check if MANAGE_EXTERNAL_STORAGE is granted."""
         try:
-            Environment = autoclass('android.os.Environment')
             return Environment.isExternalStorageManager()
         except:
             return False
@@ -4,12 +4,17 @@ Provides USB serial communication for Android devices using pyjnius.
 """
 
 import logging
+import time
+from array import array
 from kivy.utils import platform
 
 logger = logging.getLogger('RFTX.USB')
 
+# Number of IN requests kept queued on the endpoint while the port is open
+USB_IN_REQUEST_COUNT = 8
+
 if platform == 'android':
-    from jnius import autoclass, cast
+    from jnius import autoclass, cast, JavaException
     from android import mActivity
     
     # Java classes
@@ -20,6 +25,8 @@ if platform == 'android':
     UsbInterface = autoclass('android.hardware.usb.UsbInterface')
     UsbEndpoint = autoclass('android.hardware.usb.UsbEndpoint')
     UsbConstants = autoclass('android.hardware.usb.UsbConstants')
+    UsbRequest = autoclass('android.hardware.usb.UsbRequest')
+    ByteBuffer = autoclass('java.nio.ByteBuffer')
     Intent = autoclass('android.content.Intent')
     PendingIntent = autoclass('android.app.PendingIntent')
     Context = autoclass('android.content.Context')
@@ -36,6 +43,22 @@ if platform == 'android':
         0x10C4,  # Silicon Labs
     ]
 
+# Delays between permission checks while the user answers the USB permission dialog
+USB_PERMISSION_POLL_DELAYS = (0.05, 0.1, 0.2, 0.4, 0.8, 1.6)
+
+# Cached JNI handles, resolved on first use
+_activity = None
+_usb_manager = None
+
+
+def _get_usb_manager():
+    """Get the activity and its UsbManager, looking them up only once."""
+    global _activity, _usb_manager
+    if _usb_manager is None:
+        _activity = PythonActivity.mActivity
+        _usb_manager = _activity.getSystemService(Context.USB_SERVICE)
+    return _activity, _usb_manager
+
 
 def get_usb_devices():
     """Get list of connected USB devices."""
@@ -43,16 +66,13 @@ def get_usb_devices():
         return []
         
     try:
-        activity = PythonActivity.mActivity
-        usb_manager = activity.getSystemService(Context.USB_SERVICE)
+        _, usb_manager = _get_usb_manager()
         
         device_list = usb_manager.getDeviceList()
         devices = []
         
         # Convert Java HashMap to Python list
-        for device_name in device_list.keySet().toArray():
-            device = device_list.get(device_name)
-            
+        for device in device_list.values().toArray():
             devices.append({
                 'name': device.getDeviceName(),
                 'vendor_id': device.getVendorId(),
@@ -75,8 +95,7 @@ def request_usb_permission(device):
         return False
         
     try:
-        activity = PythonActivity.mActivity
-        usb_manager = activity.getSystemService(Context.USB_SERVICE)
+        activity, usb_manager = _get_usb_manager()
         
         if usb_manager.hasPermission(device):
             return True
@@ -92,11 +111,13 @@ def request_usb_permission(device):
         usb_manager.requestPermission(device, permission_intent)
         
         # Note: This is asynchronous, need to wait for broadcast receiver
-        # For simplicity, we'll check permission after a delay
-        import time
-        time.sleep(2)
-        
-        return usb_manager.hasPermission(device)
+        # For simplicity, poll for the permission with a growing delay
+        for delay in USB_PERMISSION_POLL_DELAYS:
+            time.sleep(delay)
+            if usb_manager.hasPermission(device):
+                return True
+                
+        return False
         
     except Exception as e:
         logger.error(f"Error requesting USB permission: {e}")
@@ -116,6 +137,8 @@ class AndroidUSBSerial:
         self.endpoint_in = None
         self.endpoint_out = None
         self.is_open = False
+        self._in_requests = []
+        self._rx_pending = bytearray()
         
         if platform != 'android':
             raise RuntimeError("AndroidUSBSerial only works on Android")
@@ -126,8 +149,7 @@ class AndroidUSBSerial:
             return True
             
         try:
-            activity = PythonActivity.mActivity
-            usb_manager = activity.getSystemService(Context.USB_SERVICE)
+            _, usb_manager = _get_usb_manager()
             
             # Request permission if needed
             if not usb_manager.hasPermission(self.device):
@@ -169,6 +191,9 @@ class AndroidUSBSerial:
             # Configure serial parameters (baudrate, etc.)
             self._configure_serial()
             
+            # Keep reads posted on the IN endpoint so transfers overlap
+            self._queue_in_requests()
+            
             self.is_open = True
             logger.info(f"USB serial opened: {self.device.getDeviceName()}")
             return True
@@ -221,12 +246,63 @@ class AndroidUSBSerial:
         except Exception as e:
             logger.warning(f"Error configuring serial (may not be FTDI): {e}")
             
+    def _queue_in_requests(self):
+        """Post asynchronous reads on the IN endpoint."""
+        packet_size = self.endpoint_in.getMaxPacketSize()
+        self._rx_pending = bytearray()
+        self._in_requests = []
+        
+        for _ in range(USB_IN_REQUEST_COUNT):
+            request = UsbRequest()
+            if not request.initialize(self.connection, self.endpoint_in):
+                raise IOError("Failed to initialize USB request")
+                
+            buffer = ByteBuffer.allocate(packet_size)
+            request.setClientData(buffer)
+            request.queue(buffer)
+            self._in_requests.append(request)
+            
+    def _reap_in_request(self, timeout_ms):
+        """Wait for one completed IN request, keep its data and queue it again."""
+        try:
+            request = self.connection.requestWait(timeout_ms)
+        except JavaException:
+            # Timed out with no completed request
+            return False
+            
+        if request is None:
+            return False
+            
+        buffer = cast('java.nio.ByteBuffer', request.getClientData())
+        count = buffer.position()
+        if count:
+            # pyjnius returns Java's byte[] as signed values (-128..127), which a
+            # bytearray rejects; a signed array reinterprets them as raw bytes
+            self._rx_pending += array('b', buffer.array()[:count]).tobytes()
+            
+        buffer.clear()
+        request.queue(buffer)
+        return True
+        
+    def _fill_pending(self, size):
+        """Reap IN requests until size bytes are pending or the timeout expires."""
+        deadline = time.monotonic() + self.timeout
+        while len(self._rx_pending) < size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._reap_in_request(max(int(remaining * 1000), 1)):
+                break
+                
     def close(self):
         """Close USB serial connection."""
         if not self.is_open:
             return
             
         try:
+            for request in self._in_requests:
+                request.cancel()
+                request.close()
+            self._in_requests = []
+            
             if self.connection and self.interface:
                 self.connection.releaseInterface(self.interface)
                 
@@ -245,8 +321,8 @@ class AndroidUSBSerial:
             raise IOError("USB serial not open")
             
         try:
-            # Convert to byte array
-            if isinstance(data, str):
+            # Convert to byte array (framed messages are already bytes)
+            if type(data) is not bytes and isinstance(data, str):
                 data = data.encode()
                 
             # Write to endpoint
@@ -272,26 +348,33 @@ class AndroidUSBSerial:
             raise IOError("USB serial not open")
             
         try:
-            # Create buffer
-            buffer = bytearray(size)
-            
-            # Read from endpoint
-            bytes_read = self.connection.bulkTransfer(
-                self.endpoint_in,
-                buffer,
-                size,
-                int(self.timeout * 1000)
-            )
+            self._fill_pending(size)
             
-            if bytes_read < 0:
-                return b''
-                
-            return bytes(buffer[:bytes_read])
+            data = bytes(self._rx_pending[:size])
+            del self._rx_pending[:size]
+            return data
             
         except Exception as e:
             logger.error(f"Error reading from USB: {e}")
             return b''
             
+    def readinto(self, buffer):
+        """Read data from USB serial directly into a writable buffer."""
+        if not self.is_open:
+            raise IOError("USB serial not open")
+            
+        try:
+            self._fill_pending(len(buffer))
+            
+            bytes_read = min(len(buffer), len(self._rx_pending))
+            buffer[:bytes_read] = self._rx_pending[:bytes_read]
+            del self._rx_pending[:bytes_read]
+            return bytes_read
+            
+        except Exception as e:
+            logger.error(f"Error reading from USB: {e}")
+            return 0
+            
     def flush(self):
         """Flush output buffer."""
         # USB doesn't require explicit flushing
@@ -300,12 +383,15 @@ class AndroidUSBSerial:
     @property
     def in_waiting(self):
         """Get number of bytes waiting to be read."""
-        # Not easily available on Android USB, return 0
-        return 0
+        return len(self._rx_pending)
 
 
 class DesktopSerialWrapper:
-    """Wrapper for desktop serial (for testing)."""
+    """Wrapper for desktop serial (for testing).
+    
+    create_serial returns pyserial's Serial directly; this is kept for code that
+    constructs the wrapper itself.
+    """
     
     def __init__(self, port, baudrate=500000, timeout=1.0):
         """Initialize desktop serial."""
@@ -368,5 +454,13 @@ def create_serial(port, baudrate=500000, timeout=1.0):
         serial_obj.open()
         return serial_obj
     else:
-        # Desktop testing
-        return DesktopSerialWrapper(port, baudrate, timeout)
+        # Desktop testing, pyserial already provides the same interface
+        import serial
+        return serial.Serial(
+            port=port,
+            baudrate=baudrate,
+            bytesize=serial.EIGHTBITS,
+            parity=serial.PARITY_NONE,
+            stopbits=serial.STOPBITS_ONE,
+            timeout=timeout
+        )
@@ -1,28 +1,26 @@
+import gc
 import os
 import sys
 from kivy.app import App
 from kivy.uix.screenmanager import ScreenManager, Screen
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.gridlayout import GridLayout
 from kivy.uix.button import Button
 from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
-from kivy.uix.progressbar import ProgressBar
-from kivy.uix.scrollview import ScrollView
 from kivy.uix.filechooser import FileChooserListView
 from kivy.uix.popup import Popup
-from kivy.uix.spinner import Spinner
 from kivy.clock import Clock
-from kivy.properties import StringProperty, NumericProperty, BooleanProperty
+from kivy.properties import StringProperty, NumericProperty, BooleanProperty, ListProperty
 from kivy.core.window import Window
 from kivy.utils import platform
-import threading
 import logging
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 
 from android_permissions import permissions_manager, request_permissions_on_start
 
 # Import our flasher (will be adapted for Android)
-from rftx_flasher_android import BMWFlasher
+from rftx_flasher_android import BMWFlasher, DTC_STATUS_BITS
 from tune_matcher import TuneMatcher
 
 # Configure logging
@@ -32,107 +30,81 @@ logging.basicConfig(
 )
 logger = logging.getLogger('RFTX.Android')
 
+# How often progress bars pick up the progress reported by the worker (seconds)
+PROGRESS_REFRESH_INTERVAL = 1 / 15
+
+# UI colors (RGBA), matching the #:set colors in rftx.kv
+COLOR_BLUE = (0, 0.47, 1, 1)
+COLOR_RED = (1, 0.27, 0.27, 1)  # Errors
+COLOR_GREEN = (0, 1, 0, 1)  # Success
+COLOR_ORANGE = (1, 0.65, 0, 1)  # Operation in progress
+COLOR_DANGER = (1, 0, 0, 1)  # Confirm buttons for risky operations
+
+# Folder scanned for tune packages (zip files), as in the desktop GUI
+TUNES_DIRECTORY = 'tunes'
+
+# Broadcast actions for USB devices being plugged in or removed
+USB_DEVICE_ACTIONS = [
+    'android.hardware.usb.action.USB_DEVICE_ATTACHED',
+    'android.hardware.usb.action.USB_DEVICE_DETACHED',
+]
+
 # Set window size for development (will be full screen on Android)
 if platform != 'android':
     Window.size = (360, 640)
 
 
+def _call_scheduled(func, args, dt):
+    """Clock callback for run_on_main_thread."""
+    func(*args)
+
+
+def run_on_main_thread(func, *args):
+    """Schedule func(*args) on the Kivy main thread from a worker."""
+    Clock.schedule_once(partial(_call_scheduled, func, args))
+
+
 class HomeScreen(Screen):
     """Home screen for ECU connection."""
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.flasher = None
-        self.build_ui()
-        
-    def build_ui(self):
-        layout = BoxLayout(orientation='vertical', padding=10, spacing=10)
-        
-        # Header
-        header = Label(
-            text='RFTX TUNING',
-            size_hint_y=0.1,
-            font_size='24sp',
-            bold=True,
-            color=(0, 0.47, 1, 1)
-        )
-        layout.add_widget(header)
-        
-        # Connection section
-        conn_layout = GridLayout(cols=2, size_hint_y=0.2, spacing=10)
-        conn_layout.add_widget(Label(text='USB Device:', size_hint_x=0.3))
-        
-        self.port_spinner = Spinner(
-            text='Select Device',
-            values=['Scanning...'],
-            size_hint_x=0.7
-        )
-        conn_layout.add_widget(self.port_spinner)
-        
-        self.connect_btn = Button(
-            text='Connect',
-            size_hint=(1, None),
-            height=50,
-            background_color=(0, 0.47, 1, 1)
-        )
-        self.connect_btn.bind(on_press=self.on_connect)
-        conn_layout.add_widget(self.connect_btn)
-        
-        layout.add_widget(conn_layout)
-        
-        # ECU Info section
-        info_label = Label(
-            text='ECU Information',
-            size_hint_y=0.05,
-            font_size='18sp',
-            bold=True
-        )
-        layout.add_widget(info_label)
-        
-        # ECU info grid
-        self.info_grid = GridLayout(cols=2, size_hint_y=0.4, spacing=5)
-        
-        self.info_labels = {}
-        info_fields = ['VIN', 'ECU ID', 'SW Version', 'HW Version', 'ECU Type', 'Bootloader']
-        
-        for field in info_fields:
-            self.info_grid.add_widget(Label(text=f'{field}:', halign='left', size_hint_x=0.4))
-            value_label = Label(text='Not connected', halign='left', size_hint_x=0.6)
-            self.info_labels[field] = value_label
-            self.info_grid.add_widget(value_label)
-            
-        layout.add_widget(self.info_grid)
-        
-        # Status label
-        self.status_label = Label(
-            text='',
-            size_hint_y=0.1,
-            color=(1, 0.27, 0.27, 1)
-        )
-        layout.add_widget(self.status_label)
-        
-        # Navigation buttons
-        nav_layout = BoxLayout(size_hint_y=0.15, spacing=10)
-        
-        flash_btn = Button(text='Flash', background_color=(0, 0.75, 1, 1))
-        flash_btn.bind(on_press=lambda x: self.manager.current = 'flash')
-        nav_layout.add_widget(flash_btn)
         
-        dtc_btn = Button(text='DTC', background_color=(0, 0.75, 1, 1))
-        dtc_btn.bind(on_press=lambda x: self.manager.current = 'dtc')
-        nav_layout.add_widget(dtc_btn)
-        
-        settings_btn = Button(text='Settings', background_color=(0, 0.75, 1, 1))
-        settings_btn.bind(on_press=lambda x: self.manager.current = 'settings')
-        nav_layout.add_widget(settings_btn)
-        
-        layout.add_widget(nav_layout)
-        
-        self.add_widget(layout)
+        # Widgets are created by the <HomeScreen> rule in rftx.kv
+        self.port_spinner = self.ids.port_spinner
+        self.connect_btn = self.ids.connect_btn
+        self.status_label = self.ids.status_label
+        self.info_labels = {
+            'VIN': self.ids.vin,
+            'ECU ID': self.ids.ecu_id,
+            'SW Version': self.ids.sw_version,
+            'HW Version': self.ids.hw_version,
+            'ECU Type': self.ids.ecu_type,
+            'Bootloader': self.ids.bootloader,
+        }
+        
+        # Device list shown in the spinner, rescanned only when USB devices change
+        self._port_cache = None
+        self._usb_receiver = None
+        if platform == 'android':
+            from android.broadcast import BroadcastReceiver
+            self._usb_receiver = BroadcastReceiver(self.on_usb_devices_changed, actions=USB_DEVICE_ACTIONS)
+            self._usb_receiver.start()
         
         # Schedule port scanning
         Clock.schedule_once(self.scan_ports, 0.5)
         
+    def on_usb_devices_changed(self, context, intent):
+        """Rescan devices after a USB attach/detach broadcast (called on a Java thread)."""
+        Clock.schedule_once(self.scan_ports)
+        
+    def stop_usb_monitor(self):
+        """Stop listening for USB attach/detach broadcasts."""
+        if self._usb_receiver:
+            self._usb_receiver.stop()
+            self._usb_receiver = None
+            
     def scan_ports(self, dt):
         """Scan for available USB devices."""
         try:
@@ -140,15 +112,20 @@ class HomeScreen(Screen):
                 from android_usb_serial import get_usb_devices
                 devices = get_usb_devices()
                 if devices:
-                    self.port_spinner.values = [f"{d['name']} ({d['vendor_id']:04x}:{d['product_id']:04x})" for d in devices]
+                    ports = [f"{d['name']} ({d['vendor_id']:04x}:{d['product_id']:04x})" for d in devices]
                 else:
-                    self.port_spinner.values = ['No USB devices found']
+                    ports = ['No USB devices found']
             else:
                 # Desktop testing
-                self.port_spinner.values = ['COM1', 'COM3', '/dev/ttyUSB0']
+                ports = ['COM1', 'COM3', '/dev/ttyUSB0']
         except Exception as e:
             logger.error(f"Error scanning ports: {e}")
-            self.port_spinner.values = ['Error scanning devices']
+            ports = ['Error scanning devices']
+            
+        # Only touch the spinner when the list actually changed
+        if ports != self._port_cache:
+            self._port_cache = ports
+            self.port_spinner.values = ports
             
     def on_connect(self, instance):
         """Handle connect button press."""
@@ -156,7 +133,7 @@ class HomeScreen(Screen):
         self.connect_btn.disabled = True
         
         # Run connection in background thread
-        threading.Thread(target=self.connect_thread, daemon=True).start()
+        App.get_running_app().io_pool.submit(self.connect_thread)
         
     def connect_thread(self):
         """Background thread for connection."""
@@ -173,17 +150,37 @@ class HomeScreen(Screen):
                 ecu_info = app.flasher.read_ecu_info()
                 
                 # Update UI on main thread
-                Clock.schedule_once(lambda dt: self.update_ecu_info(ecu_info), 0)
+                run_on_main_thread(self.update_ecu_info, ecu_info)
+                run_on_main_thread(setattr, app, 'tune_rows', self.match_tunes(ecu_info))
             else:
-                Clock.schedule_once(lambda dt: self.show_error('Failed to connect to ECU'), 0)
+                run_on_main_thread(self.show_error, 'Failed to connect to ECU')
                 
         except Exception as e:
             logger.error(f"Connection error: {e}")
-            Clock.schedule_once(lambda dt: self.show_error(f'Error: {str(e)}'), 0)
+            run_on_main_thread(self.show_error, f'Error: {str(e)}')
             
         finally:
-            Clock.schedule_once(lambda dt: setattr(self.connect_btn, 'disabled', False), 0)
+            run_on_main_thread(setattr, self.connect_btn, 'disabled', False)
+            
+    def match_tunes(self, ecu_info):
+        """Find tunes for the connected ECU as rows for the tune list (worker thread)."""
+        try:
+            # Built on the io worker at startup, so this does not wait
+            matcher = App.get_running_app().tune_future.result()
+            tunes = matcher.find_matching_tunes(
+                ecu_info.get('vin', ''),
+                ecu_info.get('ecu_id', ''),
+                ecu_info.get('sw_version', '')
+            )
+        except Exception as e:
+            logger.error(f"Tune matching error: {e}")
+            return [{'text': f'Error matching tunes: {str(e)}'}]
             
+        if not tunes:
+            return [{'text': 'No matching tunes found'}]
+        return [{'text': f"{tune['tune_type']} ({tune['match_confidence']}%): {tune['full_path']}"}
+                for tune in tunes]
+        
     def update_ecu_info(self, ecu_info):
         """Update ECU info labels."""
         self.info_labels['VIN'].text = ecu_info.get('vin', 'Unknown')
@@ -193,13 +190,18 @@ class HomeScreen(Screen):
         self.info_labels['ECU Type'].text = ecu_info.get('ecu_type', 'Unknown')
         self.info_labels['Bootloader'].text = str(ecu_info.get('in_bootloader', False))
         
+        # Hand the connected flasher to every screen so handlers don't look it up per event
+        self.flasher = App.get_running_app().flasher
+        for screen in self.manager.screens:
+            screen.flasher = self.flasher
+        
         self.status_label.text = 'Connected successfully!'
-        self.status_label.color = (0, 1, 0, 1)
+        self.status_label.color = COLOR_GREEN
         
     def show_error(self, message):
         """Show error message."""
         self.status_label.text = message
-        self.status_label.color = (1, 0.27, 0.27, 1)
+        self.status_label.color = COLOR_RED
 
 
 class FlashScreen(Screen):
@@ -207,93 +209,18 @@ class FlashScreen(Screen):
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self.flasher = None
         self.selected_file = None
-        self.build_ui()
-        
-    def build_ui(self):
-        layout = BoxLayout(orientation='vertical', padding=10, spacing=10)
-        
-        # Header
-        header = Label(
-            text='Flash ECU',
-            size_hint_y=0.08,
-            font_size='20sp',
-            bold=True
-        )
-        layout.add_widget(header)
-        
-        # File selection
-        file_layout = BoxLayout(size_hint_y=0.1, spacing=10)
-        
-        self.file_label = Label(
-            text='No file selected',
-            size_hint_x=0.6
-        )
-        file_layout.add_widget(self.file_label)
-        
-        select_btn = Button(
-            text='Select File',
-            size_hint_x=0.4,
-            background_color=(0, 0.47, 1, 1)
-        )
-        select_btn.bind(on_press=self.select_file)
-        file_layout.add_widget(select_btn)
+        # Progress written by the flash worker, shown by a periodic UI refresh
+        self._progress = 0
+        self._progress_pump = None
         
-        layout.add_widget(file_layout)
-        
-        # Flash button
-        self.flash_btn = Button(
-            text='Flash ECU',
-            size_hint_y=0.1,
-            background_color=(0, 0.47, 1, 1),
-            disabled=True
-        )
-        self.flash_btn.bind(on_press=self.on_flash)
-        layout.add_widget(self.flash_btn)
-        
-        # Progress bar
-        self.progress_bar = ProgressBar(max=100, size_hint_y=0.05)
-        layout.add_widget(self.progress_bar)
-        
-        # Status label
-        self.status_label = Label(
-            text='',
-            size_hint_y=0.05,
-            color=(1, 0.27, 0.27, 1)
-        )
-        layout.add_widget(self.status_label)
-        
-        # Matching tunes section
-        tunes_label = Label(
-            text='Matching Tunes',
-            size_hint_y=0.05,
-            font_size='16sp',
-            bold=True
-        )
-        layout.add_widget(tunes_label)
-        
-        # Scrollable tune list
-        scroll = ScrollView(size_hint_y=0.47)
-        self.tune_list = Label(
-            text='Connect to ECU to see matching tunes',
-            size_hint_y=None,
-            halign='left',
-            valign='top'
-        )
-        self.tune_list.bind(texture_size=self.tune_list.setter('size'))
-        scroll.add_widget(self.tune_list)
-        layout.add_widget(scroll)
-        
-        # Back button
-        back_btn = Button(
-            text='Back',
-            size_hint_y=0.1,
-            background_color=(0.5, 0.5, 0.5, 1)
-        )
-        back_btn.bind(on_press=lambda x: setattr(self.manager, 'current', 'home'))
-        layout.add_widget(back_btn)
-        
-        self.add_widget(layout)
+        # Widgets are created by the <FlashScreen> rule in rftx.kv
+        self.file_label = self.ids.file_label
+        self.flash_btn = self.ids.flash_btn
+        self.progress_bar = self.ids.progress_bar
+        self.status_label = self.ids.status_label
+        self.tune_list = self.ids.tune_list
         
     def select_file(self, instance):
         """Open file chooser."""
@@ -327,16 +254,14 @@ class FlashScreen(Screen):
                 self.flash_btn.disabled = False
             popup.dismiss()
             
-        select_btn.bind(on_press=on_select)
-        cancel_btn.bind(on_press=popup.dismiss)
+        select_btn.fbind('on_press', on_select)
+        cancel_btn.fbind('on_press', popup.dismiss)
         
         popup.open()
         
     def on_flash(self, instance):
         """Handle flash button press."""
-        app = App.get_running_app()
-        
-        if not app.flasher or not app.flasher.connected:
+        if not self.flasher or not self.flasher.connected:
             self.show_error('Please connect to ECU first')
             return
             
@@ -352,7 +277,7 @@ class FlashScreen(Screen):
         ))
         
         btn_layout = BoxLayout(size_hint_y=0.2, spacing=10)
-        yes_btn = Button(text='Proceed', background_color=(1, 0, 0, 1))
+        yes_btn = Button(text='Proceed', background_color=COLOR_DANGER)
         no_btn = Button(text='Cancel')
         btn_layout.add_widget(yes_btn)
         btn_layout.add_widget(no_btn)
@@ -368,8 +293,8 @@ class FlashScreen(Screen):
             popup.dismiss()
             self.start_flash()
             
-        yes_btn.bind(on_press=proceed)
-        no_btn.bind(on_press=popup.dismiss)
+        yes_btn.fbind('on_press', proceed)
+        no_btn.fbind('on_press', popup.dismiss)
         
         popup.open()
         
@@ -377,41 +302,58 @@ class FlashScreen(Screen):
         """Start flashing process."""
         self.flash_btn.disabled = True
         self.status_label.text = 'Flashing... Do not disconnect!'
-        self.status_label.color = (1, 0.65, 0, 1)
+        self.status_label.color = COLOR_ORANGE
+        self._progress = 0
         self.progress_bar.value = 0
+        self._progress_pump = Clock.schedule_interval(self._pump_progress, PROGRESS_REFRESH_INTERVAL)
         
         # Run flash in background thread
-        threading.Thread(target=self.flash_thread, daemon=True).start()
+        App.get_running_app().io_pool.submit(self.flash_thread)
         
     def flash_thread(self):
         """Background thread for flashing."""
+        # Keep the garbage collector from pausing the transfer mid-block
+        gc.disable()
         try:
-            app = App.get_running_app()
-            
             def progress_callback(percent):
-                Clock.schedule_once(lambda dt: setattr(self.progress_bar, 'value', percent), 0)
+                self._progress = percent
                 
-            app.flasher.flash_ecu(self.selected_file, progress_callback)
+            self.flasher.flash_ecu(self.selected_file, progress_callback)
             
-            Clock.schedule_once(lambda dt: self.flash_complete(), 0)
+            run_on_main_thread(self.flash_complete)
             
         except Exception as e:
             logger.error(f"Flash error: {e}")
-            Clock.schedule_once(lambda dt: self.show_error(f'Flash failed: {str(e)}'), 0)
+            run_on_main_thread(self.show_error, f'Flash failed: {str(e)}')
             
         finally:
-            Clock.schedule_once(lambda dt: setattr(self.flash_btn, 'disabled', False), 0)
+            gc.enable()
+            gc.collect()
+            run_on_main_thread(setattr, self.flash_btn, 'disabled', False)
+            run_on_main_thread(self._stop_progress_pump)
             
     def flash_complete(self):
         """Handle flash completion."""
         self.status_label.text = 'Flash completed successfully!'
-        self.status_label.color = (0, 1, 0, 1)
+        self.status_label.color = COLOR_GREEN
+        self._progress = 100
         self.progress_bar.value = 100
         
+    def _pump_progress(self, dt):
+        """Show the latest progress reported by the worker."""
+        self.progress_bar.value = self._progress
+        
+    def _stop_progress_pump(self):
+        """Stop refreshing the progress bar and show the final progress."""
+        if self._progress_pump:
+            self._progress_pump.cancel()
+            self._progress_pump = None
+        self.progress_bar.value = self._progress
+        
     def show_error(self, message):
         """Show error message."""
         self.status_label.text = message
-        self.status_label.color = (1, 0.27, 0.27, 1)
+        self.status_label.color = COLOR_RED
 
 
 class DTCScreen(Screen):
@@ -419,116 +361,63 @@ class DTCScreen(Screen):
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.build_ui()
-        
-    def build_ui(self):
-        layout = BoxLayout(orientation='vertical', padding=10, spacing=10)
-        
-        # Header
-        header = Label(
-            text='Diagnostic Trouble Codes',
-            size_hint_y=0.08,
-            font_size='20sp',
-            bold=True
-        )
-        layout.add_widget(header)
-        
-        # Buttons
-        btn_layout = BoxLayout(size_hint_y=0.1, spacing=10)
-        
-        read_btn = Button(
-            text='Read DTCs',
-            background_color=(0, 0.47, 1, 1)
-        )
-        read_btn.bind(on_press=self.read_dtcs)
-        btn_layout.add_widget(read_btn)
+        self.flasher = None
         
-        clear_btn = Button(
-            text='Clear DTCs',
-            background_color=(1, 0.27, 0.27, 1)
-        )
-        clear_btn.bind(on_press=self.clear_dtcs)
-        btn_layout.add_widget(clear_btn)
-        
-        layout.add_widget(btn_layout)
-        
-        # DTC list
-        scroll = ScrollView(size_hint_y=0.72)
-        self.dtc_label = Label(
-            text='Press "Read DTCs" to scan for codes',
-            size_hint_y=None,
-            halign='left',
-            valign='top'
-        )
-        self.dtc_label.bind(texture_size=self.dtc_label.setter('size'))
-        scroll.add_widget(self.dtc_label)
-        layout.add_widget(scroll)
-        
-        # Back button
-        back_btn = Button(
-            text='Back',
-            size_hint_y=0.1,
-            background_color=(0.5, 0.5, 0.5, 1)
-        )
-        back_btn.bind(on_press=lambda x: setattr(self.manager, 'current', 'home'))
-        layout.add_widget(back_btn)
+        # Widgets are created by the <DTCScreen> rule in rftx.kv
+        self.dtc_list = self.ids.dtc_list
         
-        self.add_widget(layout)
+    def show_lines(self, *lines):
+        """Replace the rows shown in the DTC list."""
+        self.dtc_list.data = [{'text': line} for line in lines]
         
     def read_dtcs(self, instance):
         """Read DTCs from ECU."""
-        app = App.get_running_app()
-        
-        if not app.flasher or not app.flasher.connected:
-            self.dtc_label.text = 'Error: Not connected to ECU'
+        if not self.flasher or not self.flasher.connected:
+            self.show_lines('Error: Not connected to ECU')
             return
             
-        self.dtc_label.text = 'Reading DTCs...'
+        self.show_lines('Reading DTCs...')
         
         # Run in background thread
-        threading.Thread(target=self.read_dtcs_thread, daemon=True).start()
+        App.get_running_app().io_pool.submit(self.read_dtcs_thread)
         
     def read_dtcs_thread(self):
         """Background thread for reading DTCs."""
         try:
-            app = App.get_running_app()
-            dtcs = app.flasher.read_dtcs()
+            dtcs = self.flasher.read_dtcs()
             
             if not dtcs:
-                Clock.schedule_once(lambda dt: setattr(self.dtc_label, 'text', 'No DTCs found'), 0)
+                run_on_main_thread(self.show_lines, 'No DTCs found')
             else:
-                dtc_text = '\n'.join([f"{dtc['text']} - Status: {bin(dtc['status'])[2:].zfill(8)}" for dtc in dtcs])
-                Clock.schedule_once(lambda dt: setattr(self.dtc_label, 'text', dtc_text), 0)
+                lines = [f"{dtc['text']} - Status: {DTC_STATUS_BITS[dtc['status']]}" for dtc in dtcs]
+                run_on_main_thread(self.show_lines, *lines)
                 
         except Exception as e:
             logger.error(f"Read DTC error: {e}")
-            Clock.schedule_once(lambda dt: setattr(self.dtc_label, 'text', f'Error: {str(e)}'), 0)
+            run_on_main_thread(self.show_lines, f'Error: {str(e)}')
             
     def clear_dtcs(self, instance):
         """Clear DTCs from ECU."""
-        app = App.get_running_app()
-        
-        if not app.flasher or not app.flasher.connected:
-            self.dtc_label.text = 'Error: Not connected to ECU'
+        if not self.flasher or not self.flasher.connected:
+            self.show_lines('Error: Not connected to ECU')
             return
             
-        self.dtc_label.text = 'Clearing DTCs...'
+        self.show_lines('Clearing DTCs...')
         
         # Run in background thread
-        threading.Thread(target=self.clear_dtcs_thread, daemon=True).start()
+        App.get_running_app().io_pool.submit(self.clear_dtcs_thread)
         
     def clear_dtcs_thread(self):
         """Background thread for clearing DTCs."""
         try:
-            app = App.get_running_app()
-            if app.flasher.clear_dtcs():
-                Clock.schedule_once(lambda dt: setattr(self.dtc_label, 'text', 'DTCs cleared successfully'), 0)
+            if self.flasher.clear_dtcs():
+                run_on_main_thread(self.show_lines, 'DTCs cleared successfully')
             else:
-                Clock.schedule_once(lambda dt: setattr(self.dtc_label, 'text', 'Failed to clear DTCs'), 0)
+                run_on_main_thread(self.show_lines, 'Failed to clear DTCs')
                 
         except Exception as e:
             logger.error(f"Clear DTC error: {e}")
-            Clock.schedule_once(lambda dt: setattr(self.dtc_label, 'text', f'Error: {str(e)}'), 0)
+            run_on_main_thread(self.show_lines, f'Error: {str(e)}')
 
 
 class SettingsScreen(Screen):
@@ -536,110 +425,79 @@ class SettingsScreen(Screen):
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.build_ui()
-        
-    def build_ui(self):
-        layout = BoxLayout(orientation='vertical', padding=10, spacing=10)
-        
-        # Header
-        header = Label(
-            text='Settings',
-            size_hint_y=0.1,
-            font_size='20sp',
-            bold=True
-        )
-        layout.add_widget(header)
-        
-        # Backup button
-        backup_btn = Button(
-            text='Backup ECU',
-            size_hint_y=0.15,
-            background_color=(0, 0.47, 1, 1)
-        )
-        backup_btn.bind(on_press=self.backup_ecu)
-        layout.add_widget(backup_btn)
-        
-        # Reset button
-        reset_btn = Button(
-            text='Reset ECU',
-            size_hint_y=0.15,
-            background_color=(1, 0.27, 0.27, 1)
-        )
-        reset_btn.bind(on_press=self.reset_ecu)
-        layout.add_widget(reset_btn)
-        
-        # Progress bar
-        self.progress_bar = ProgressBar(max=100, size_hint_y=0.05)
-        layout.add_widget(self.progress_bar)
-        
-        # Status label
-        self.status_label = Label(
-            text='',
-            size_hint_y=0.45,
-            color=(0, 1, 0, 1)
-        )
-        layout.add_widget(self.status_label)
-        
-        # Back button
-        back_btn = Button(
-            text='Back',
-            size_hint_y=0.1,
-            background_color=(0.5, 0.5, 0.5, 1)
-        )
-        back_btn.bind(on_press=lambda x: setattr(self.manager, 'current', 'home'))
-        layout.add_widget(back_btn)
+        self.flasher = None
+        # Progress written by the backup worker, shown by a periodic UI refresh
+        self._progress = 0
+        self._progress_pump = None
         
-        self.add_widget(layout)
+        # Widgets are created by the <SettingsScreen> rule in rftx.kv
+        self.progress_bar = self.ids.progress_bar
+        self.status_label = self.ids.status_label
         
     def backup_ecu(self, instance):
         """Backup ECU."""
-        app = App.get_running_app()
-        
-        if not app.flasher or not app.flasher.connected:
+        if not self.flasher or not self.flasher.connected:
             self.status_label.text = 'Error: Not connected to ECU'
-            self.status_label.color = (1, 0.27, 0.27, 1)
+            self.status_label.color = COLOR_RED
             return
             
         self.status_label.text = 'Starting backup...'
-        self.status_label.color = (1, 0.65, 0, 1)
+        self.status_label.color = COLOR_ORANGE
+        self._progress = 0
         self.progress_bar.value = 0
+        self._progress_pump = Clock.schedule_interval(self._pump_progress, PROGRESS_REFRESH_INTERVAL)
         
         # Run in background thread
-        threading.Thread(target=self.backup_thread, daemon=True).start()
+        App.get_running_app().io_pool.submit(self.backup_thread)
         
     def backup_thread(self):
         """Background thread for backup."""
+        # Collected once the dump is written, see finally
+        gc.disable()
         try:
-            app = App.get_running_app()
-            
             def progress_callback(percent):
-                Clock.schedule_once(lambda dt: setattr(self.progress_bar, 'value', percent), 0)
+                self._progress = percent
                 
             # Save to Downloads folder on Android
             backup_dir = '/sdcard/Download' if platform == 'android' else os.path.expanduser('~/Downloads')
             os.makedirs(backup_dir, exist_ok=True)
             
-            backup_file = app.flasher.backup_ecu(None, progress_callback)
+            backup_file = self.flasher.backup_ecu(None, progress_callback)
             
-            Clock.schedule_once(lambda dt: self.backup_complete(backup_file), 0)
+            run_on_main_thread(self.backup_complete, backup_file)
             
         except Exception as e:
             logger.error(f"Backup error: {e}")
-            Clock.schedule_once(lambda dt: self.show_error(f'Backup failed: {str(e)}'), 0)
+            run_on_main_thread(self.show_error, f'Backup failed: {str(e)}')
+            
+        finally:
+            gc.enable()
+            gc.collect()
+            run_on_main_thread(self._stop_progress_pump)
             
     def backup_complete(self, backup_file):
         """Handle backup completion."""
         self.status_label.text = f'Backup saved to:\n{backup_file}'
-        self.status_label.color = (0, 1, 0, 1)
+        self.status_label.color = COLOR_GREEN
+        self._progress = 100
         self.progress_bar.value = 100
         
+    def _pump_progress(self, dt):
+        """Show the latest progress reported by the worker."""
+        self.progress_bar.value = self._progress
+        
+    def _stop_progress_pump(self):
+        """Stop refreshing the progress bar and show the final progress."""
+        if self._progress_pump:
+            self._progress_pump.cancel()
+            self._progress_pump = None
+        self.progress_bar.value = self._progress
+        
     def reset_ecu(self, instance):
         """Reset ECU."""
-        app = App.get_running_app()
-        
-        if not app.flasher or not app.flasher.connected:
+        if not self.flasher or not self.flasher.connected:
             self.status_label.text = 'Error: Not connected to ECU'
-            self.status_label.color = (1, 0.27, 0.27, 1)
+            self.status_label.color = COLOR_RED
             return
             
         # Show confirmation popup
@@ -647,7 +505,7 @@ class SettingsScreen(Screen):
         content.add_widget(Label(text='Are you sure you want to reset the ECU?'))
         
         btn_layout = BoxLayout(size_hint_y=0.3, spacing=10)
-        yes_btn = Button(text='Yes', background_color=(1, 0, 0, 1))
+        yes_btn = Button(text='Yes', background_color=COLOR_DANGER)
         no_btn = Button(text='No')
         btn_layout.add_widget(yes_btn)
         btn_layout.add_widget(no_btn)
@@ -662,35 +520,49 @@ class SettingsScreen(Screen):
         def do_reset(instance):
             popup.dismiss()
             try:
-                if app.flasher.reset_ecu():
+                if self.flasher.reset_ecu():
                     self.status_label.text = 'ECU reset command sent'
-                    self.status_label.color = (0, 1, 0, 1)
+                    self.status_label.color = COLOR_GREEN
                 else:
                     self.status_label.text = 'Failed to reset ECU'
-                    self.status_label.color = (1, 0.27, 0.27, 1)
+                    self.status_label.color = COLOR_RED
             except Exception as e:
                 self.status_label.text = f'Error: {str(e)}'
-                self.status_label.color = (1, 0.27, 0.27, 1)
+                self.status_label.color = COLOR_RED
                 
-        yes_btn.bind(on_press=do_reset)
-        no_btn.bind(on_press=popup.dismiss)
+        yes_btn.fbind('on_press', do_reset)
+        no_btn.fbind('on_press', popup.dismiss)
         
         popup.open()
         
     def show_error(self, message):
         """Show error message."""
         self.status_label.text = message
-        self.status_label.color = (1, 0.27, 0.27, 1)
+        self.status_label.color = COLOR_RED
+
+
+# Screens built on first navigation rather than at startup
+LAZY_SCREENS = {
+    'flash': FlashScreen,
+    'dtc': DTCScreen,
+    'settings': SettingsScreen,
+}
 
 
 class RFTXApp(App):
     """Main RFTX application."""
     
+    # Rows for the flash screen's tune list, filled in after connecting
+    tune_rows = ListProperty([{'text': 'Connect to ECU to see matching tunes'}])
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.flasher = None
-        self.tune_matcher = None
+        self.tune_future = None
         self.permissions_granted = False
+        # Background worker for ECU operations; a single worker also keeps
+        # them from interleaving on the shared flasher
+        self.io_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rftx-io')
         
     def build(self):
         """Build the app UI."""
@@ -705,15 +577,29 @@ class RFTXApp(App):
                     
             request_permissions_on_start(on_permissions)
             
+        # Set up the tune matcher off the UI thread; connect_thread picks it up
+        self.tune_future = self.io_pool.submit(TuneMatcher, TUNES_DIRECTORY)
+        
+        # Screen layouts come from rftx.kv, which Kivy loads for RFTXApp before build();
+        # only the home screen is built here, the rest in show_screen()
         sm = ScreenManager()
         
         sm.add_widget(HomeScreen(name='home'))
-        sm.add_widget(FlashScreen(name='flash'))
-        sm.add_widget(DTCScreen(name='dtc'))
-        sm.add_widget(SettingsScreen(name='settings'))
         
         return sm
         
+    def show_screen(self, name):
+        """Switch to a screen, building it the first time it is opened."""
+        if not self.root.has_screen(name):
+            screen = LAZY_SCREENS[name](name=name)
+            screen.flasher = self.flasher
+            self.root.add_widget(screen)
+        self.root.current = name
+        
+    def on_start(self):
+        """Move the widgets built at startup out of the collector's reach."""
+        gc.freeze()
+        
     def show_permissions_dialog(self):
         """Show dialog for missing permissions."""
         content = BoxLayout(orientation='vertical', padding=10, spacing=10)
@@ -723,7 +609,7 @@ class RFTXApp(App):
         ))
         
         btn_layout = BoxLayout(size_hint_y=0.3, spacing=10)
-        settings_btn = Button(text='Open Settings', background_color=(0, 0.47, 1, 1))
+        settings_btn = Button(text='Open Settings', background_color=COLOR_BLUE)
         close_btn = Button(text='Close')
         btn_layout.add_widget(settings_btn)
         btn_layout.add_widget(close_btn)
@@ -740,17 +626,20 @@ class RFTXApp(App):
             permissions_manager.open_app_settings()
             popup.dismiss()
             
-        settings_btn.bind(on_press=open_settings)
-        close_btn.bind(on_press=popup.dismiss)
+        settings_btn.fbind('on_press', open_settings)
+        close_btn.fbind('on_press', popup.dismiss)
         
         popup.open()
         
     def on_stop(self):
         """Clean up on app exit."""
+        self.io_pool.shutdown(wait=False, cancel_futures=True)
+        self.root.get_screen('home').stop_usb_monitor()
         if self.flasher:
             self.flasher.disconnect()
-        if self.tune_matcher:
-            self.tune_matcher.cleanup()
+        # cancel() fails once the matcher has been built; it then owns a temp dir
+        if self.tune_future and not self.tune_future.cancel():
+            self.tune_future.result().cleanup()
 
 
 if __name__ == '__main__':
@@ -5,7 +5,9 @@ Modified version of RFTX_FLASHER.py for Android compatibility.
 
 import os
 import time
+import threading
 import logging
+import re
 import struct
 from typing import List, Dict, Optional, Callable, Any
 from kivy.utils import platform
@@ -23,6 +25,25 @@ logger = logging.getLogger('RFTX.Flasher')
 CAN_ID_REQUEST = 0x6F1
 CAN_ID_RESPONSE = 0x6F9
 
+# Serial framing of a CAN frame on the K+DCAN link: [CAN ID (4 bytes), DLC (1 byte)]
+CAN_FRAME_HEADER = struct.Struct(">IB")
+CAN_FRAME_SIZE = CAN_FRAME_HEADER.size + 8
+
+# Size of the reusable receive buffer the port reads into
+RX_BUFFER_SIZE = 4096
+
+# PCI bytes of a run of consecutive frames, sliced from the starting sequence number
+CONSECUTIVE_FRAME_PCI = bytes(0x20 | (i & 0x0F) for i in range(16 + 4095 // 7 + 1))
+
+# Zero padding for short CAN frames, indexed by the number of missing bytes
+FRAME_PADDING = tuple(bytes(i) for i in range(8))
+
+FLOW_CONTROL_CONTINUE = b'\x30\x00\x00\x00\x00\x00\x00\x00'  # Block size 0, no delay
+
+# Tester present frames with the "no response" flag set, written as-is by the keep-alive
+TESTER_PRESENT_UDS_FRAME = CAN_FRAME_HEADER.pack(CAN_ID_REQUEST, 8) + b'\x02\x3E\x80\x00\x00\x00\x00\x00'
+TESTER_PRESENT_KWP_FRAME = CAN_FRAME_HEADER.pack(CAN_ID_REQUEST, 8) + b'\x02\x3E\x02\x00\x00\x00\x00\x00'
+
 KWP_START_DIAGNOSTIC_SESSION = 0x10
 KWP_ECU_RESET = 0x11
 KWP_CLEAR_DIAGNOSTIC_INFORMATION = 0x14
@@ -62,6 +83,18 @@ SECURITY_LEVEL_PROGRAMMING = 0x01
 
 ROUTINE_ERASE_MEMORY_SECTOR = 0xFF02
 
+# KWP2000 DTC record: status, DTC code
+KWP_DTC_RECORD = struct.Struct(">BH")
+
+# UDS DTC record: DTC high byte, DTC mid/low bytes, status
+UDS_DTC_RECORD = struct.Struct(">BHB")
+
+# OBD-II DTC type letter, indexed by the top two bits of the DTC high byte
+DTC_TYPE_LETTERS = "PCBU"  # Powertrain, Chassis, Body, Network
+
+# DTC status byte as an 8-digit binary string, indexed by status
+DTC_STATUS_BITS = tuple(format(status, '08b') for status in range(256))
+
 # ECU memory maps
 ECU_MEMORY_MAPS = {
     "MSD80": {
@@ -112,6 +145,34 @@ DEFAULT_MEMORY_MAP = {
     "erase_required": True
 }
 
+# Matches any known ECU type in an ECU ID, longest names first
+ECU_TYPE_PATTERN = re.compile("|".join(re.escape(ecu_type)
+                                       for ecu_type in sorted(ECU_MEMORY_MAPS, key=len, reverse=True)))
+
+
+def is_positive_response(response: Optional[bytes], service_id: int) -> bool:
+    """Return True if the response is the positive response to the given service."""
+    return bool(response) and response[0] == service_id | POSITIVE_RESPONSE
+
+
+def build_consecutive_frames(can_id: int, data: bytes, data_index: int,
+                             sequence_number: int, frame_count: int) -> bytes:
+    """Lay out consecutive frames as serial CAN frames, zero-padded to 8 data bytes.
+    
+    Filled one byte position at a time across all frames with slice assignments.
+    Returned as bytes, the type pyjnius passes to bulkTransfer as byte[].
+    """
+    burst = bytearray(frame_count * CAN_FRAME_SIZE)
+    for column, value in enumerate(CAN_FRAME_HEADER.pack(can_id, 8)):
+        if value:
+            burst[column::CAN_FRAME_SIZE] = bytes((value,)) * frame_count
+    pci_column = CAN_FRAME_HEADER.size
+    burst[pci_column::CAN_FRAME_SIZE] = CONSECUTIVE_FRAME_PCI[sequence_number:sequence_number + frame_count]
+    payload = data[data_index:data_index + 7 * frame_count].ljust(7 * frame_count, b'\x00')
+    for column in range(7):
+        burst[pci_column + 1 + column::CAN_FRAME_SIZE] = payload[column::7]
+    return bytes(burst)
+
 
 class ISOTPHandler:
     """ISO-TP protocol handler for CAN communication."""
@@ -124,6 +185,15 @@ class ISOTPHandler:
         self.fc_timeout = 1.0
         self.st_min = 0
         self.block_size = 0
+        # Serializes port writes with the watchdog's keep-alive frames
+        self.tx_lock = threading.Lock()
+        # Reusable receive buffer; bytes [_rx_start, _rx_end) are not yet parsed
+        self._rx_buf = bytearray(RX_BUFFER_SIZE)
+        self._rx_view = memoryview(self._rx_buf)
+        self._rx_start = 0
+        self._rx_end = 0
+        # Read timeout last applied to the port (None until the first read)
+        self._port_timeout = None
         
     def send(self, data: bytes) -> Optional[bytes]:
         """Send data using ISO-TP protocol."""
@@ -134,9 +204,7 @@ class ISOTPHandler:
     
     def _send_single_frame(self, data: bytes) -> Optional[bytes]:
         """Send single frame."""
-        frame = bytes([0x00 | len(data)]) + data
-        if len(frame) < 8:
-            frame += b'\x00' * (8 - len(frame))
+        frame = bytes((len(data),)) + data + FRAME_PADDING[7 - len(data)]
         self._send_can_frame(self.tx_id, frame)
         return self._receive_isotp()
     
@@ -158,23 +226,33 @@ class ISOTPHandler:
         data_index = 6
         
         while data_index < data_length:
-            if self.st_min <= 127:
-                time.sleep(self.st_min / 1000.0)
-            elif self.st_min >= 0xF1 and self.st_min <= 0xF9:
-                time.sleep((self.st_min - 0xF0) * 100 / 1000000.0)
-            
-            remaining = data[data_index:data_index+7]
-            consecutive_frame = bytes([0x20 | (sequence_number & 0x0F)]) + remaining
-            
-            if len(consecutive_frame) < 8:
-                consecutive_frame += b'\x00' * (8 - len(consecutive_frame))
-            
-            self._send_can_frame(self.tx_id, consecutive_frame)
-            
-            sequence_number = (sequence_number + 1) & 0x0F
-            data_index += 7
+            # Consecutive frames until the next flow control (block size 0 = no limit)
+            block_frames = (data_length - data_index + 6) // 7
+            if self.block_size != 0:
+                block_frames = min(block_frames, self.block_size)
+                
+            burst = build_consecutive_frames(self.tx_id, data, data_index, sequence_number, block_frames)
+            sequence_number = (sequence_number + block_frames) & 0x0F
+            data_index += 7 * block_frames
+                
+            separation_time = self._separation_time()
+            if separation_time:
+                next_frame_time = time.monotonic()
+                for offset in range(0, len(burst), CAN_FRAME_SIZE):
+                    # Only sleep for the part of the separation time the USB write didn't take
+                    delay = next_frame_time - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    with self.tx_lock:
+                        self.port.write(burst[offset:offset + CAN_FRAME_SIZE])
+                    next_frame_time = time.monotonic() + separation_time
+            else:
+                # No separation time required: send the whole block in one USB transfer
+                with self.tx_lock:
+                    self.port.write(burst)
+            self.port.flush()
             
-            if self.block_size != 0 and sequence_number % self.block_size == 0 and data_index < data_length:
+            if data_index < data_length:
                 fc_frame = self._receive_can_frame(self.rx_id, timeout=self.fc_timeout)
                 if not fc_frame or len(fc_frame) < 3 or fc_frame[0] != 0x30:
                     logger.error("No valid flow control during consecutive frames")
@@ -184,6 +262,14 @@ class ISOTPHandler:
         
         return self._receive_isotp()
     
+    def _separation_time(self) -> float:
+        """Minimum separation time between consecutive frames in seconds."""
+        if 0 < self.st_min <= 127:
+            return self.st_min / 1000.0
+        elif 0xF1 <= self.st_min <= 0xF9:
+            return (self.st_min - 0xF0) * 100 / 1000000.0
+        return 0.0
+        
     def _receive_isotp(self) -> Optional[bytes]:
         """Receive ISO-TP message."""
         frame = self._receive_can_frame(self.rx_id, timeout=self.timeout)
@@ -201,8 +287,7 @@ class ISOTPHandler:
             length = ((frame[0] & 0x0F) << 8) | frame[1]
             response_data = bytearray(frame[2:8])
             
-            fc_frame = bytes([0x30, 0, 0]) + b'\x00' * 5
-            self._send_can_frame(self.tx_id, fc_frame)
+            self._send_can_frame(self.tx_id, FLOW_CONTROL_CONTINUE)
             
             expected_sequence = 1
             
@@ -230,10 +315,16 @@ class ISOTPHandler:
             logger.error(f"Unexpected frame type: {frame_type:02X}")
             return None
     
+    def send_tester_present(self, protocol: str) -> None:
+        """Send tester present without waiting for a response."""
+        with self.tx_lock:
+            self.port.write(TESTER_PRESENT_UDS_FRAME if protocol == "UDS" else TESTER_PRESENT_KWP_FRAME)
+        
     def _send_can_frame(self, can_id: int, data: bytes) -> None:
         """Send CAN frame."""
-        can_frame = struct.pack(">I", can_id) + bytes([len(data)]) + data
-        self.port.write(can_frame)
+        can_frame = CAN_FRAME_HEADER.pack(can_id, len(data)) + data
+        with self.tx_lock:
+            self.port.write(can_frame)
         self.port.flush()
         
     def _receive_can_frame(self, expected_id: int = None, timeout: float = None) -> Optional[bytes]:
@@ -241,28 +332,51 @@ class ISOTPHandler:
         if timeout is None:
             timeout = self.timeout
             
-        original_timeout = self.port.timeout
-        self.port.timeout = timeout
-        
-        try:
-            header = self.port.read(5)
-            if len(header) != 5:
-                return None
+        # Read until a complete frame is buffered, taking everything the adapter
+        # has already delivered so the next frames of a response need no read.
+        # The port reads straight into the free tail of the receive buffer.
+        rx_buf = self._rx_buf
+        start = self._rx_start
+        end = self._rx_end
+        while True:
+            if end - start >= CAN_FRAME_HEADER.size:
+                frame_end = start + CAN_FRAME_HEADER.size + rx_buf[start + 4]
+                if end >= frame_end:
+                    break
+                needed = frame_end - end
+            else:
+                needed = start + CAN_FRAME_HEADER.size - end
                 
-            can_id = struct.unpack(">I", header[:4])[0]
-            dlc = header[4]
-            
-            if expected_id is not None and can_id != expected_id:
-                return None
+            if RX_BUFFER_SIZE - end < CAN_FRAME_SIZE:
+                # Move the partial frame to the front to make room
+                rx_buf[:end - start] = rx_buf[start:end]
+                end -= start
+                start = 0
                 
-            data = self.port.read(dlc)
-            if len(data) != dlc:
+            if timeout != self._port_timeout:
+                self.port.timeout = timeout
+                self._port_timeout = timeout
+                
+            size = min(max(needed, self.port.in_waiting), RX_BUFFER_SIZE - end)
+            count = self.port.readinto(self._rx_view[end:end + size])
+            end += count
+            if count < needed:
+                # Timed out; drop the partial frame so the next receive starts on a boundary
+                self._rx_start = self._rx_end = 0
                 return None
                 
-            return data
+        can_id, dlc = CAN_FRAME_HEADER.unpack_from(rx_buf, start)
+        data = bytes(rx_buf[start + CAN_FRAME_HEADER.size:frame_end])
+        if frame_end == end:
+            self._rx_start = self._rx_end = 0
+        else:
+            self._rx_start = frame_end
+            self._rx_end = end
+        
+        if expected_id is not None and can_id != expected_id:
+            return None
             
-        finally:
-            self.port.timeout = original_timeout
+        return data
 
 
 class BMWFlasher:
@@ -283,6 +397,8 @@ class BMWFlasher:
         self.ecu_type = None
         self.ecu_memory_map = None
         self.in_bootloader = False
+        self.watchdog_thread = None
+        self.watchdog_stop = threading.Event()
         self.last_activity = 0
         
     def find_available_ports(self) -> List[str]:
@@ -328,6 +444,8 @@ class BMWFlasher:
                 self.isotp = None
                 return False
                 
+            self._start_watchdog()
+            
             self.connected = True
             logger.info(f"Connected to ECU")
             return True
@@ -362,36 +480,36 @@ class BMWFlasher:
     
     def _try_uds_communication(self) -> bool:
         """Try UDS protocol."""
-        response = self._send_uds_command(UDS_TESTER_PRESENT, [0x00])
-        if response and response[0] == UDS_TESTER_PRESENT + POSITIVE_RESPONSE:
+        response = self._send_uds_command(UDS_TESTER_PRESENT, b'\x00')
+        if is_positive_response(response, UDS_TESTER_PRESENT):
             return True
-        response = self._send_uds_command(UDS_DIAGNOSTIC_SESSION_CONTROL, [SESSION_DEFAULT])
-        if response and response[0] == UDS_DIAGNOSTIC_SESSION_CONTROL + POSITIVE_RESPONSE:
+        response = self._send_uds_command(UDS_DIAGNOSTIC_SESSION_CONTROL, bytes((SESSION_DEFAULT,)))
+        if is_positive_response(response, UDS_DIAGNOSTIC_SESSION_CONTROL):
             return True
         return False
     
     def _try_kwp_communication(self) -> bool:
         """Try KWP2000 protocol."""
-        response = self._send_kwp_command(KWP_TESTER_PRESENT, [0x00])
-        if response and response[0] == KWP_TESTER_PRESENT + POSITIVE_RESPONSE:
+        response = self._send_kwp_command(KWP_TESTER_PRESENT, b'\x00')
+        if is_positive_response(response, KWP_TESTER_PRESENT):
             return True
-        response = self._send_kwp_command(KWP_START_DIAGNOSTIC_SESSION, [0x81])
-        if response and response[0] == KWP_START_DIAGNOSTIC_SESSION + POSITIVE_RESPONSE:
+        response = self._send_kwp_command(KWP_START_DIAGNOSTIC_SESSION, b'\x81')
+        if is_positive_response(response, KWP_START_DIAGNOSTIC_SESSION):
             return True
         return False
     
-    def _send_uds_command(self, service_id: int, data: List[int]) -> Optional[bytes]:
+    def _send_uds_command(self, service_id: int, data: bytes = b'') -> Optional[bytes]:
         """Send UDS command."""
         if not self.port or not self.isotp:
             return None
-        self.last_activity = time.time()
-        message = bytes([service_id]) + bytes(data)
+        self.last_activity = time.monotonic()
+        message = bytes((service_id,)) + data
         try:
             response = self.isotp.send(message)
             if response and len(response) >= 3 and response[0] == NEGATIVE_RESPONSE:
                 if response[2] == NRC_RESPONSE_PENDING:
+                    # The receive blocks until the ECU answers, no sleep needed
                     for _ in range(10):
-                        time.sleep(0.1)
                         response = self.isotp._receive_isotp()
                         if not response or response[0] != NEGATIVE_RESPONSE or response[2] != NRC_RESPONSE_PENDING:
                             break
@@ -400,20 +518,51 @@ class BMWFlasher:
             logger.error(f"Error sending UDS command: {e}")
             return None
     
-    def _send_kwp_command(self, service_id: int, data: List[int]) -> Optional[bytes]:
+    def _send_kwp_command(self, service_id: int, data: bytes = b'') -> Optional[bytes]:
         """Send KWP2000 command."""
         if not self.port or not self.isotp:
             return None
-        self.last_activity = time.time()
-        message = bytes([service_id]) + bytes(data)
+        self.last_activity = time.monotonic()
+        message = bytes((service_id,)) + data
         try:
             return self.isotp.send(message)
         except Exception as e:
             logger.error(f"Error sending KWP command: {e}")
             return None
     
+    def _start_watchdog(self):
+        """Start the thread that keeps the diagnostic session alive."""
+        self._stop_watchdog()
+        stop_event = threading.Event()
+        
+        def watchdog_function():
+            # Requests keep the session open themselves; only idle periods need tester present
+            while not stop_event.wait(1.0):
+                if time.monotonic() - self.last_activity >= 2.0:
+                    self._send_tester_present()
+                    
+        self.watchdog_stop = stop_event
+        self.watchdog_thread = threading.Thread(target=watchdog_function, name="RFTX-watchdog", daemon=True)
+        self.watchdog_thread.start()
+        
+    def _stop_watchdog(self):
+        """Stop the watchdog thread if it is running."""
+        self.watchdog_stop.set()
+        self.watchdog_thread = None
+        
+    def _send_tester_present(self):
+        """Send tester present from the watchdog thread."""
+        if not self.port or not self.isotp:
+            return
+        self.last_activity = time.monotonic()
+        try:
+            self.isotp.send_tester_present(self.protocol)
+        except Exception as e:
+            logger.warning(f"Failed to send tester present: {e}")
+    
     def disconnect(self):
         """Disconnect from ECU."""
+        self._stop_watchdog()
         if self.port:
             try:
                 self.port.close()
@@ -432,43 +581,43 @@ class BMWFlasher:
         ecu_info = {}
         
         if self.protocol == "KWP2000":
-            response = self._send_kwp_command(KWP_READ_ECU_IDENTIFICATION, [0x90])
-            if response and response[0] == KWP_READ_ECU_IDENTIFICATION + POSITIVE_RESPONSE:
+            response = self._send_kwp_command(KWP_READ_ECU_IDENTIFICATION, b'\x90')
+            if is_positive_response(response, KWP_READ_ECU_IDENTIFICATION):
                 self.vin = response[2:].decode('ascii', errors='ignore').strip('\x00')
                 ecu_info['vin'] = self.vin
                 
-            response = self._send_kwp_command(KWP_READ_ECU_IDENTIFICATION, [0x92])
-            if response and response[0] == KWP_READ_ECU_IDENTIFICATION + POSITIVE_RESPONSE:
+            response = self._send_kwp_command(KWP_READ_ECU_IDENTIFICATION, b'\x92')
+            if is_positive_response(response, KWP_READ_ECU_IDENTIFICATION):
                 self.ecu_id = response[2:].decode('ascii', errors='ignore').strip('\x00')
                 ecu_info['ecu_id'] = self.ecu_id
                 
-            response = self._send_kwp_command(KWP_READ_ECU_IDENTIFICATION, [0x94])
-            if response and response[0] == KWP_READ_ECU_IDENTIFICATION + POSITIVE_RESPONSE:
+            response = self._send_kwp_command(KWP_READ_ECU_IDENTIFICATION, b'\x94')
+            if is_positive_response(response, KWP_READ_ECU_IDENTIFICATION):
                 self.sw_version = response[2:].decode('ascii', errors='ignore').strip('\x00')
                 ecu_info['sw_version'] = self.sw_version
                 
-            response = self._send_kwp_command(KWP_READ_ECU_IDENTIFICATION, [0x93])
-            if response and response[0] == KWP_READ_ECU_IDENTIFICATION + POSITIVE_RESPONSE:
+            response = self._send_kwp_command(KWP_READ_ECU_IDENTIFICATION, b'\x93')
+            if is_positive_response(response, KWP_READ_ECU_IDENTIFICATION):
                 self.hw_version = response[2:].decode('ascii', errors='ignore').strip('\x00')
                 ecu_info['hw_version'] = self.hw_version
         else:
-            response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, [0xF1, 0x90])
-            if response and response[0] == UDS_READ_DATA_BY_IDENTIFIER + POSITIVE_RESPONSE:
+            response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, b'\xF1\x90')
+            if is_positive_response(response, UDS_READ_DATA_BY_IDENTIFIER):
                 self.vin = response[3:].decode('ascii', errors='ignore').strip('\x00')
                 ecu_info['vin'] = self.vin
                 
-            response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, [0xF1, 0x8A])
-            if response and response[0] == UDS_READ_DATA_BY_IDENTIFIER + POSITIVE_RESPONSE:
+            response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, b'\xF1\x8A')
+            if is_positive_response(response, UDS_READ_DATA_BY_IDENTIFIER):
                 self.ecu_id = response[3:].decode('ascii', errors='ignore').strip('\x00')
                 ecu_info['ecu_id'] = self.ecu_id
                 
-            response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, [0xF1, 0x89])
-            if response and response[0] == UDS_READ_DATA_BY_IDENTIFIER + POSITIVE_RESPONSE:
+            response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, b'\xF1\x89')
+            if is_positive_response(response, UDS_READ_DATA_BY_IDENTIFIER):
                 self.sw_version = response[3:].decode('ascii', errors='ignore').strip('\x00')
                 ecu_info['sw_version'] = self.sw_version
                 
-            response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, [0xF1, 0x91])
-            if response and response[0] == UDS_READ_DATA_BY_IDENTIFIER + POSITIVE_RESPONSE:
+            response = self._send_uds_command(UDS_READ_DATA_BY_IDENTIFIER, b'\xF1\x91')
+            if is_positive_response(response, UDS_READ_DATA_BY_IDENTIFIER):
                 self.hw_version = response[3:].decode('ascii', errors='ignore').strip('\x00')
                 ecu_info['hw_version'] = self.hw_version
         
@@ -485,11 +634,9 @@ class BMWFlasher:
     
     def _determine_ecu_type(self, ecu_id: str) -> str:
         """Determine ECU type."""
-        ecu_id = ecu_id.upper()
-        if "MSD80" in ecu_id:
-            return "MSD80"
-        elif "MEVD17.2" in ecu_id:
-            return "MEVD17.2"
+        match = ECU_TYPE_PATTERN.search(ecu_id.upper())
+        if match:
+            return match.group(0)
         return "MSD80"
     
     # Include simplified versions of flash_ecu, backup_ecu, read_dtcs, clear_dtcs, reset_ecu
@@ -513,30 +660,27 @@ class BMWFlasher:
         
         dtcs = []
         if self.protocol == "KWP2000":
-            response = self._send_kwp_command(KWP_READ_DTC_BY_STATUS, [0x00])
-            if response and response[0] == KWP_READ_DTC_BY_STATUS + POSITIVE_RESPONSE:
-                for i in range(2, len(response), 3):
-                    if i + 2 < len(response):
-                        status = response[i]
-                        dtc_code = (response[i+1] << 8) | response[i+2]
-                        dtcs.append({
-                            "code": dtc_code,
-                            "text": f"P{dtc_code:04X}",
-                            "status": status
-                        })
+            response = self._send_kwp_command(KWP_READ_DTC_BY_STATUS, b'\x00')
+            if is_positive_response(response, KWP_READ_DTC_BY_STATUS):
+                # Whole records only, a trailing partial record is ignored
+                end = 2 + (len(response) - 2) // KWP_DTC_RECORD.size * KWP_DTC_RECORD.size
+                for status, dtc_code in KWP_DTC_RECORD.iter_unpack(response[2:end]):
+                    dtcs.append({
+                        "code": dtc_code,
+                        "text": f"P{dtc_code:04X}",
+                        "status": status
+                    })
         else:
-            response = self._send_uds_command(UDS_READ_DTC, [0x02, 0xFF])
-            if response and response[0] == UDS_READ_DTC + POSITIVE_RESPONSE:
-                for i in range(3, len(response), 4):
-                    if i + 3 < len(response):
-                        dtc_code = (response[i] << 16) | (response[i+1] << 8) | response[i+2]
-                        status = response[i+3]
-                        dtc_type = "P" if response[i] & 0xC0 == 0x00 else "C"
-                        dtcs.append({
-                            "code": dtc_code,
-                            "text": f"{dtc_type}{dtc_code:06X}",
-                            "status": status
-                        })
+            response = self._send_uds_command(UDS_READ_DTC, b'\x02\xFF')
+            if is_positive_response(response, UDS_READ_DTC):
+                end = 3 + (len(response) - 3) // UDS_DTC_RECORD.size * UDS_DTC_RECORD.size
+                for dtc_high, dtc_mid_low, status in UDS_DTC_RECORD.iter_unpack(response[3:end]):
+                    dtc_code = (dtc_high << 16) | dtc_mid_low
+                    dtcs.append({
+                        "code": dtc_code,
+                        "text": f"{DTC_TYPE_LETTERS[dtc_high >> 6]}{dtc_code:06X}",
+                        "status": status
+                    })
         
         logger.info(f"Read {len(dtcs)} DTCs")
         return dtcs
@@ -547,11 +691,11 @@ class BMWFlasher:
             raise ConnectionError("Not connected")
         
         if self.protocol == "KWP2000":
-            response = self._send_kwp_command(KWP_CLEAR_DIAGNOSTIC_INFORMATION, [0xFF, 0xFF, 0xFF])
-            return response and response[0] == KWP_CLEAR_DIAGNOSTIC_INFORMATION + POSITIVE_RESPONSE
+            response = self._send_kwp_command(KWP_CLEAR_DIAGNOSTIC_INFORMATION, b'\xFF\xFF\xFF')
+            return is_positive_response(response, KWP_CLEAR_DIAGNOSTIC_INFORMATION)
         else:
-            response = self._send_uds_command(UDS_CLEAR_DTC, [0xFF, 0xFF, 0xFF])
-            return response and response[0] == UDS_CLEAR_DTC + POSITIVE_RESPONSE
+            response = self._send_uds_command(UDS_CLEAR_DTC, b'\xFF\xFF\xFF')
+            return is_positive_response(response, UDS_CLEAR_DTC)
     
     def reset_ecu(self) -> bool:
         """Reset ECU."""
@@ -559,7 +703,7 @@ class BMWFlasher:
             raise ConnectionError("Not connected")
         
         if self.protocol == "KWP2000":
-            self._send_kwp_command(KWP_ECU_RESET, [0x01])
+            self._send_kwp_command(KWP_ECU_RESET, b'\x01')
         else:
-            self._send_uds_command(UDS_ECU_RESET, [0x01])
+            self._send_uds_command(UDS_ECU_RESET, b'\x01')
         return True
@@ -1,14 +1,15 @@
 import sys
 import os
-import time
+import functools
+from collections import deque
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
     QLabel, QProgressBar, QComboBox, QMessageBox, QFileDialog, QTabWidget,
     QTextEdit, QSplashScreen, QToolTip, QGridLayout
 )
 from PyQt5.QtGui import QFont, QPixmap, QIcon, QPalette, QColor, QLinearGradient
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from rftx_flasherr import BMWFlasher
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
+from RFTX_FLASHER import BMWFlasher, DTC_STATUS_BITS
 from tune_matcher import TuneMatcher
 import logging
 
@@ -23,9 +24,167 @@ logging.basicConfig(
 )
 logger = logging.getLogger('RFTX.GUI')
 
+# Log records are queued and written to the log tab in batches
+LOG_FLUSH_INTERVAL_MS = 100
+LOG_QUEUE_SIZE = 5000
+LOG_MAX_LINES = 2000
+
+# Window stylesheet, parsed once; widgets opt in through their object names so
+# message boxes and file dialogs parented to the window keep the default look
+APP_STYLESHEET = """
+    QWidget#header {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0078FF, stop:1 #00BFFF);
+        border-radius: 8px;
+        padding: 10px;
+    }
+    QLabel#headerLabel { color: white; padding: 5px; }
+    QLabel#title { color: #FFFFFF; padding: 10px; }
+    QLabel#fieldName { color: #FFFFFF; }
+    QLabel#fieldValue { color: #BBBBBB; background: #3A3A3A; padding: 8px; border-radius: 4px; }
+    QLabel#fileLabel { color: #BBBBBB; padding: 5px; }
+    QLabel#statusLabel { color: #FF4444; padding: 5px; }
+    QLabel#footer { color: #666666; padding: 10px; }
+    QComboBox#portCombo { padding: 5px; background: #3A3A3A; color: white; }
+    QTextEdit#panel { background: #3A3A3A; color: white; padding: 10px; border: 1px solid #0078FF; }
+
+    QTabWidget#tabs::pane { border: 1px solid #0078FF; background: #262626; margin: 5px; }
+    QTabWidget#tabs QTabBar::tab { 
+        background: #3A3A3A; 
+        color: white; 
+        padding: 10px 20px; 
+        border-radius: 4px; 
+        margin-right: 2px; 
+    }
+    QTabWidget#tabs QTabBar::tab:selected { 
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0078FF, stop:1 #00BFFF); 
+        color: white; 
+    }
+    QTabWidget#tabs QTabBar::tab:hover { background: #4A4A4A; }
+
+    QPushButton#actionButton {
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0078FF, stop:1 #00BFFF);
+        color: white;
+        border-radius: 5px;
+        padding: 8px;
+        font: 12pt "Segoe UI";
+    }
+    QPushButton#actionButton:hover { background: #00BFFF; }
+    QPushButton#actionButton:disabled { background: #666666; color: #AAAAAA; }
+
+    QProgressBar#progressBar { 
+        background: #3A3A3A; 
+        border: 1px solid #0078FF; 
+        border-radius: 5px; 
+        text-align: center; 
+        color: white; 
+    }
+    QProgressBar#progressBar::chunk { 
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0078FF, stop:1 #00BFFF); 
+    }
+"""
+
+# Help and About tab contents, rendered the first time each tab is opened
+HELP_HTML = """
+    <h2 style='color: #0078FF;'>How to Use RFTX TUNING</h2>
+    <p>RFTX TUNING is a free tool for flashing BMW ECUs. Follow these steps to use the software safely and effectively.</p>
+    <h3 style='color: #00BFFF;'>Requirements</h3>
+    <ul>
+        <li><b>Hardware</b>: K+DCAN cable, BMW vehicle with supported ECU (e.g., MSD80, MEVD17.2), stable 12V+ power supply.</li>
+        <li><b>Files</b>: Valid .bin tune files in a <code>tunes/</code> directory. Optional: <code>tune_info.json</code> for tune matching.</li>
+    </ul>
+    <h3 style='color: #00BFFF;'>Step-by-Step Guide</h3>
+    <ol>
+        <li><b>Connect to ECU</b>:
+            <ul>
+                <li>Go to the <b>Home</b> tab.</li>
+                <li>Select your COM port (connected to the K+DCAN cable).</li>
+                <li>Click <b>Connect</b>. Ensure the vehicle’s battery is stable.</li>
+                <li>ECU information (VIN, ECU ID, etc.) will appear.</li>
+            </ul>
+        </li>
+        <li><b>Flash ECU</b>:
+            <ul>
+                <li>Go to the <b>Flash</b> tab.</li>
+                <li>Matching tunes will be listed based on ECU info.</li>
+                <li>Click <b>Select .bin File</b>, choose a .bin file, then click <b>Flash ECU</b>.</li>
+                <li>Ensure the battery is stable. Monitor the progress bar. Do not disconnect the cable or power during flashing.</li>
+            </ul>
+        </li>
+        <li><b>Backup ECU</b>:
+            <ul>
+                <li>Go to the <b>Settings</b> tab.</li>
+                <li>Click <b>Backup ECU</b>, choose a save location, and confirm.</li>
+                <li>Save the .bin file as a backup of the current ECU firmware.</li>
+            </ul>
+        </li>
+        <li><b>Read/Clear DTCs</b>:
+            <ul>
+                <li>Go to the <b>DTC</b> tab.</li>
+                <li>Click <b>Read DTCs</b> to view Diagnostic Trouble Codes.</li>
+                <li>Click <b>Clear DTCs</b> to remove them.</li>
+            </ul>
+        </li>
+        <li><b>Reset ECU</b>:
+            <ul>
+                <li>Go to the <b>Settings</b> tab.</li>
+                <li>Click <b>Reset ECU</b> to reset the ECU to its default state.</li>
+            </ul>
+        </li>
+        <li><b>View Logs</b>:
+            <ul>
+                <li>Go to the <b>Logs</b> tab to view operation details.</li>
+                <li>Logs are also saved to <code>RFTX.log</code>.</li>
+            </ul>
+        </li>
+    </ol>
+    <h3 style='color: #00BFFF;'>Safety Warnings</h3>
+    <ul>
+        <li><b>Stable Power</b>: Ensure a stable 12V+ power supply (e.g., car battery or charger) during flashing to avoid ECU damage.</li>
+        <li><b>Valid Tunes</b>: Use .bin files compatible with your ECU type (e.g., MSD80).</li>
+        <li><b>Legal</b>: ECU flashing may void warranties or violate local laws. Use responsibly.</li>
+    </ul>
+    <h3 style='color: #00BFFF;'>Contact Support</h3>
+    <p>For help, contact us at: rftxtuning@gmail.com</p>
+"""
+
+ABOUT_HTML = """
+    <h2 style='color: #0078FF;'>About Us</h2>
+    <p>RFTX TUNING is dedicated to making BMW ECU tuning accessible to everyone.</p>
+    <p><b>Our Goal</b>: To make tuning free for everyone.</p>
+    <p><b>Our Mission</b>: To provide a free tuning solution. Soon we will be adding more support for other engines.</p>
+    <p><b>What's Next</b>: A new version will come out soon with enhanced features and broader compatibility.</p>
+    <p>Contact: rftxtuning@gmail.com</p>
+"""
+
+@functools.lru_cache(maxsize=None)
+def ui_font(size, bold=False):
+    """Return the shared UI font at the given point size."""
+    return QFont("Segoe UI", size, QFont.Bold if bold else QFont.Normal)
+
+def show_splash():
+    """Show loading splash screen; the caller closes it with finish()."""
+    splash = QSplashScreen(QPixmap(400, 200))
+    splash.setStyleSheet("background-color: #1C1C1C; color: #0078FF;")
+    label = QLabel("RFTX TUNING\nLoading...", splash)
+    label.setFont(ui_font(18, bold=True))
+    label.setAlignment(Qt.AlignCenter)
+    label.setStyleSheet("color: #0078FF;")
+    label.resize(400, 200)
+    splash.show()
+    return splash
+
+class LogHandler(logging.Handler):
+    """Logging handler that queues formatted records for the GUI log tab."""
+    def __init__(self, log_queue):
+        super().__init__()
+        self.log_queue = log_queue
+
+    def emit(self, record):
+        self.log_queue.append(self.format(record))
+
 class FlasherThread(QThread):
     """Thread for running BMWFlasher operations."""
-    progress = pyqtSignal(float)
+    progress = pyqtSignal(int)
     log = pyqtSignal(str)
     finished = pyqtSignal(bool, str, dict)
     status = pyqtSignal(str)
@@ -38,7 +197,9 @@ class FlasherThread(QThread):
 
     def run(self):
         try:
-            if self.operation == "connect":
+            if self.operation == "find_ports":
+                self.finished.emit(True, "Ports scanned", {"ports": self.flasher.find_available_ports()})
+            elif self.operation == "connect":
                 self.status.emit("Connecting to ECU...")
                 success = self.flasher.connect(self.kwargs.get("port"))
                 self.finished.emit(success, "Connected to ECU" if success else "Failed to connect to ECU", {})
@@ -80,8 +241,11 @@ class RFTXMainWindow(QMainWindow):
         self.tune_matcher = TuneMatcher(tunes_directory="tunes")
         self.init_ui()
         self.setup_logging()
-        self.thread = None
         self.ecu_info = {}
+        # Port enumeration can take seconds on Windows; fill the combo when it finishes
+        self.thread = FlasherThread(self.flasher, "find_ports")
+        self.thread.finished.connect(self.on_ports_found)
+        self.thread.start()
 
     def init_ui(self):
         self.setWindowTitle("RFTX TUNING – BMW ECU Flasher")
@@ -99,6 +263,7 @@ class RFTXMainWindow(QMainWindow):
         palette.setColor(QPalette.ButtonText, Qt.white)
         palette.setColor(QPalette.Highlight, QColor(0, 120, 255))
         self.setPalette(palette)
+        self.setStyleSheet(APP_STYLESHEET)
 
         # Central widget and layout
         central_widget = QWidget()
@@ -109,70 +274,40 @@ class RFTXMainWindow(QMainWindow):
 
         # Header with enhanced banner
         header_widget = QWidget()
-        header_widget.setStyleSheet("""
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0078FF, stop:1 #00BFFF);
-            border-radius: 8px;
-            padding: 10px;
-        """)
+        header_widget.setObjectName("header")
         header_layout = QHBoxLayout(header_widget)
         header_label = QLabel("RFTX TUNING")
-        header_label.setFont(QFont("Segoe UI", 24, QFont.Bold))
-        header_label.setStyleSheet("color: white; padding: 5px;")
+        header_label.setFont(ui_font(24, bold=True))
+        header_label.setObjectName("headerLabel")
         header_layout.addWidget(header_label)
         header_layout.addStretch()
         main_layout.addWidget(header_widget)
 
         # Tabs
         self.tabs = QTabWidget()
-        self.tabs.setStyleSheet("""
-            QTabWidget::pane { border: 1px solid #0078FF; background: #262626; margin: 5px; }
-            QTabBar::tab { 
-                background: #3A3A3A; 
-                color: white; 
-                padding: 10px 20px; 
-                border-radius: 4px; 
-                margin-right: 2px; 
-            }
-            QTabBar::tab:selected { 
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0078FF, stop:1 #00BFFF); 
-                color: white; 
-            }
-            QTabBar::tab:hover { background: #4A4A4A; }
-        """)
+        self.tabs.setObjectName("tabs")
+        # Rich-text tabs, parsed on first view
+        self.pending_html = {}
         main_layout.addWidget(self.tabs)
 
-        # Button style
-        button_style = """
-            QPushButton {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0078FF, stop:1 #00BFFF);
-                color: white;
-                border-radius: 5px;
-                padding: 8px;
-                font: 12pt "Segoe UI";
-            }
-            QPushButton:hover { background: #00BFFF; }
-            QPushButton:disabled { background: #666666; color: #AAAAAA; }
-        """
-
         # Home Tab
         home_widget = QWidget()
         home_layout = QVBoxLayout(home_widget)
         home_layout.setSpacing(10)
         home_label = QLabel("Connect to Your BMW ECU")
-        home_label.setFont(QFont("Segoe UI", 16))
+        home_label.setFont(ui_font(16))
         home_label.setAlignment(Qt.AlignCenter)
-        home_label.setStyleSheet("color: #FFFFFF; padding: 10px;")
+        home_label.setObjectName("title")
         home_layout.addWidget(home_label)
 
         port_group = QWidget()
         port_layout = QHBoxLayout(port_group)
         port_label = QLabel("COM Port:")
-        port_label.setFont(QFont("Segoe UI", 12))
+        port_label.setFont(ui_font(12))
         self.port_combo = QComboBox()
-        self.port_combo.addItems(self.flasher.find_available_ports())
-        self.port_combo.setStyleSheet("padding: 5px; background: #3A3A3A; color: white;")
+        self.port_combo.setObjectName("portCombo")
         self.connect_button = QPushButton("Connect")
-        self.connect_button.setStyleSheet(button_style)
+        self.connect_button.setObjectName("actionButton")
         self.connect_button.setToolTip("Connect to the ECU using the selected COM port")
         self.connect_button.clicked.connect(self.on_connect_clicked)
         port_layout.addWidget(port_label)
@@ -188,11 +323,11 @@ class RFTXMainWindow(QMainWindow):
         self.ecu_info_labels = {}
         for i, text in enumerate(labels):
             label = QLabel(text)
-            label.setFont(QFont("Segoe UI", 12))
-            label.setStyleSheet("color: #FFFFFF;")
+            label.setFont(ui_font(12))
+            label.setObjectName("fieldName")
             value = QLabel("Not connected")
-            value.setFont(QFont("Segoe UI", 12))
-            value.setStyleSheet("color: #BBBBBB; background: #3A3A3A; padding: 8px; border-radius: 4px;")
+            value.setFont(ui_font(12))
+            value.setObjectName("fieldValue")
             ecu_info_layout.addWidget(label, i, 0)
             ecu_info_layout.addWidget(value, i, 1)
             self.ecu_info_labels[text.strip(":")] = value
@@ -205,19 +340,19 @@ class RFTXMainWindow(QMainWindow):
         flash_layout = QVBoxLayout(flash_widget)
         flash_layout.setSpacing(10)
         flash_label = QLabel("Flash Your ECU")
-        flash_label.setFont(QFont("Segoe UI", 16))
+        flash_label.setFont(ui_font(16))
         flash_label.setAlignment(Qt.AlignCenter)
-        flash_label.setStyleSheet("color: #FFFFFF; padding: 10px;")
+        flash_label.setObjectName("title")
         flash_layout.addWidget(flash_label)
 
         flash_button_group = QWidget()
         flash_button_layout = QHBoxLayout(flash_button_group)
         self.select_file_button = QPushButton("Select .bin File")
-        self.select_file_button.setStyleSheet(button_style)
+        self.select_file_button.setObjectName("actionButton")
         self.select_file_button.setToolTip("Choose a .bin tune file to flash")
         self.select_file_button.clicked.connect(self.on_select_file_clicked)
         self.flash_button = QPushButton("Flash ECU")
-        self.flash_button.setStyleSheet(button_style)
+        self.flash_button.setObjectName("actionButton")
         self.flash_button.setToolTip("Start flashing the selected .bin file to the ECU")
         self.flash_button.setEnabled(False)
         self.flash_button.clicked.connect(self.on_flash_clicked)
@@ -226,36 +361,25 @@ class RFTXMainWindow(QMainWindow):
         flash_layout.addWidget(flash_button_group)
 
         self.selected_file_label = QLabel("No file selected")
-        self.selected_file_label.setFont(QFont("Segoe UI", 12))
-        self.selected_file_label.setStyleSheet("color: #BBBBBB; padding: 5px;")
+        self.selected_file_label.setFont(ui_font(12))
+        self.selected_file_label.setObjectName("fileLabel")
         flash_layout.addWidget(self.selected_file_label)
 
         self.progress_bar = QProgressBar()
         self.progress_bar.setTextVisible(True)
-        self.progress_bar.setStyleSheet("""
-            QProgressBar { 
-                background: #3A3A3A; 
-                border: 1px solid #0078FF; 
-                border-radius: 5px; 
-                text-align: center; 
-                color: white; 
-            }
-            QProgressBar::chunk { 
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0078FF, stop:1 #00BFFF); 
-            }
-        """)
+        self.progress_bar.setObjectName("progressBar")
         flash_layout.addWidget(self.progress_bar)
 
         self.status_label = QLabel("")
-        self.status_label.setFont(QFont("Segoe UI", 12))
-        self.status_label.setStyleSheet("color: #FF4444; padding: 5px;")
+        self.status_label.setFont(ui_font(12))
+        self.status_label.setObjectName("statusLabel")
         self.status_label.setAlignment(Qt.AlignCenter)
         flash_layout.addWidget(self.status_label)
 
         self.tune_list = QTextEdit()
         self.tune_list.setReadOnly(True)
         self.tune_list.setPlaceholderText("Matching tunes will appear here after ECU info is read")
-        self.tune_list.setStyleSheet("background: #3A3A3A; color: white; padding: 10px; border: 1px solid #0078FF;")
+        self.tune_list.setObjectName("panel")
         flash_layout.addWidget(self.tune_list)
         flash_layout.addStretch()
         self.tabs.addTab(flash_widget, "Flash")
@@ -265,11 +389,11 @@ class RFTXMainWindow(QMainWindow):
         dtc_layout = QVBoxLayout(dtc_widget)
         dtc_layout.setSpacing(10)
         self.read_dtc_button = QPushButton("Read DTCs")
-        self.read_dtc_button.setStyleSheet(button_style)
+        self.read_dtc_button.setObjectName("actionButton")
         self.read_dtc_button.setToolTip("Read Diagnostic Trouble Codes from the ECU")
         self.read_dtc_button.clicked.connect(self.on_read_dtc_clicked)
         self.clear_dtc_button = QPushButton("Clear DTCs")
-        self.clear_dtc_button.setStyleSheet(button_style)
+        self.clear_dtc_button.setObjectName("actionButton")
         self.clear_dtc_button.setToolTip("Clear all Diagnostic Trouble Codes from the ECU")
         self.clear_dtc_button.clicked.connect(self.on_clear_dtc_clicked)
         dtc_layout.addWidget(self.read_dtc_button)
@@ -277,7 +401,7 @@ class RFTXMainWindow(QMainWindow):
         self.dtc_list = QTextEdit()
         self.dtc_list.setReadOnly(True)
         self.dtc_list.setPlaceholderText("DTCs will appear here after reading")
-        self.dtc_list.setStyleSheet("background: #3A3A3A; color: white; padding: 10px; border: 1px solid #0078FF;")
+        self.dtc_list.setObjectName("panel")
         dtc_layout.addWidget(self.dtc_list)
         dtc_layout.addStretch()
         self.tabs.addTab(dtc_widget, "DTC")
@@ -289,7 +413,7 @@ class RFTXMainWindow(QMainWindow):
         self.log_text = QTextEdit()
         self.log_text.setReadOnly(True)
         self.log_text.setPlaceholderText("Operation logs will appear here")
-        self.log_text.setStyleSheet("background: #3A3A3A; color: white; padding: 10px; border: 1px solid #0078FF;")
+        self.log_text.setObjectName("panel")
         logs_layout.addWidget(self.log_text)
         self.tabs.addTab(logs_widget, "Logs")
 
@@ -298,11 +422,11 @@ class RFTXMainWindow(QMainWindow):
         settings_layout = QVBoxLayout(settings_widget)
         settings_layout.setSpacing(10)
         self.backup_button = QPushButton("Backup ECU")
-        self.backup_button.setStyleSheet(button_style)
+        self.backup_button.setObjectName("actionButton")
         self.backup_button.setToolTip("Create a backup of the ECU's current firmware")
         self.backup_button.clicked.connect(self.on_backup_clicked)
         self.reset_button = QPushButton("Reset ECU")
-        self.reset_button.setStyleSheet(button_style)
+        self.reset_button.setObjectName("actionButton")
         self.reset_button.setToolTip("Reset the ECU to its default state")
         self.reset_button.clicked.connect(self.on_reset_clicked)
         settings_layout.addWidget(self.backup_button)
@@ -315,139 +439,76 @@ class RFTXMainWindow(QMainWindow):
         help_layout = QVBoxLayout(help_widget)
         help_layout.setSpacing(10)
         help_title = QLabel("RFTX TUNING – User Guide")
-        help_title.setFont(QFont("Segoe UI", 16))
+        help_title.setFont(ui_font(16))
         help_title.setAlignment(Qt.AlignCenter)
-        help_title.setStyleSheet("color: #FFFFFF; padding: 10px;")
+        help_title.setObjectName("title")
         help_layout.addWidget(help_title)
 
         help_text = QTextEdit()
         help_text.setReadOnly(True)
-        help_text.setStyleSheet("background: #3A3A3A; color: white; padding: 10px; border: 1px solid #0078FF;")
-        help_text.setHtml("""
-            <h2 style='color: #0078FF;'>How to Use RFTX TUNING</h2>
-            <p>RFTX TUNING is a free tool for flashing BMW ECUs. Follow these steps to use the software safely and effectively.</p>
-            <h3 style='color: #00BFFF;'>Requirements</h3>
-            <ul>
-                <li><b>Hardware</b>: K+DCAN cable, BMW vehicle with supported ECU (e.g., MSD80, MEVD17.2), stable 12V+ power supply.</li>
-                <li><b>Files</b>: Valid .bin tune files in a <code>tunes/</code> directory. Optional: <code>tune_info.json</code> for tune matching.</li>
-            </ul>
-            <h3 style='color: #00BFFF;'>Step-by-Step Guide</h3>
-            <ol>
-                <li><b>Connect to ECU</b>:
-                    <ul>
-                        <li>Go to the <b>Home</b> tab.</li>
-                        <li>Select your COM port (connected to the K+DCAN cable).</li>
-                        <li>Click <b>Connect</b>. Ensure the vehicle’s battery is stable.</li>
-                        <li>ECU information (VIN, ECU ID, etc.) will appear.</li>
-                    </ul>
-                </li>
-                <li><b>Flash ECU</b>:
-                    <ul>
-                        <li>Go to the <b>Flash</b> tab.</li>
-                        <li>Matching tunes will be listed based on ECU info.</li>
-                        <li>Click <b>Select .bin File</b>, choose a .bin file, then click <b>Flash ECU</b>.</li>
-                        <li>Ensure the battery is stable. Monitor the progress bar. Do not disconnect the cable or power during flashing.</li>
-                    </ul>
-                </li>
-                <li><b>Backup ECU</b>:
-                    <ul>
-                        <li>Go to the <b>Settings</b> tab.</li>
-                        <li>Click <b>Backup ECU</b>, choose a save location, and confirm.</li>
-                        <li>Save the .bin file as a backup of the current ECU firmware.</li>
-                    </ul>
-                </li>
-                <li><b>Read/Clear DTCs</b>:
-                    <ul>
-                        <li>Go to the <b>DTC</b> tab.</li>
-                        <li>Click <b>Read DTCs</b> to view Diagnostic Trouble Codes.</li>
-                        <li>Click <b>Clear DTCs</b> to remove them.</li>
-                    </ul>
-                </li>
-                <li><b>Reset ECU</b>:
-                    <ul>
-                        <li>Go to the <b>Settings</b> tab.</li>
-                        <li>Click <b>Reset ECU</b> to reset the ECU to its default state.</li>
-                    </ul>
-                </li>
-                <li><b>View Logs</b>:
-                    <ul>
-                        <li>Go to the <b>Logs</b> tab to view operation details.</li>
-                        <li>Logs are also saved to <code>RFTX.log</code>.</li>
-                    </ul>
-                </li>
-            </ol>
-            <h3 style='color: #00BFFF;'>Safety Warnings</h3>
-            <ul>
-                <li><b>Stable Power</b>: Ensure a stable 12V+ power supply (e.g., car battery or charger) during flashing to avoid ECU damage.</li>
-                <li><b>Valid Tunes</b>: Use .bin files compatible with your ECU type (e.g., MSD80).</li>
-                <li><b>Legal</b>: ECU flashing may void warranties or violate local laws. Use responsibly.</li>
-            </ul>
-            <h3 style='color: #00BFFF;'>Contact Support</h3>
-            <p>For help, contact us at: rftxtuning@gmail.com</p>
-        """)
+        help_text.setObjectName("panel")
         help_layout.addWidget(help_text)
         self.tabs.addTab(help_widget, "Help")
+        self.pending_html[help_widget] = (help_text, HELP_HTML)
 
         # About Us Tab
         about_widget = QWidget()
         about_layout = QVBoxLayout(about_widget)
         about_layout.setSpacing(10)
         about_title = QLabel("About RFTX TUNING")
-        about_title.setFont(QFont("Segoe UI", 16))
+        about_title.setFont(ui_font(16))
         about_title.setAlignment(Qt.AlignCenter)
-        about_title.setStyleSheet("color: #FFFFFF; padding: 10px;")
+        about_title.setObjectName("title")
         about_layout.addWidget(about_title)
 
         about_text = QTextEdit()
         about_text.setReadOnly(True)
-        about_text.setStyleSheet("background: #3A3A3A; color: white; padding: 10px; border: 1px solid #0078FF;")
-        about_text.setHtml("""
-            <h2 style='color: #0078FF;'>About Us</h2>
-            <p>RFTX TUNING is dedicated to making BMW ECU tuning accessible to everyone.</p>
-            <p><b>Our Goal</b>: To make tuning free for everyone.</p>
-            <p><b>Our Mission</b>: To provide a free tuning solution. Soon we will be adding more support for other engines.</p>
-            <p><b>What's Next</b>: A new version will come out soon with enhanced features and broader compatibility.</p>
-            <p>Contact: rftxtuning@gmail.com</p>
-        """)
+        about_text.setObjectName("panel")
         about_layout.addWidget(about_text)
         self.tabs.addTab(about_widget, "About Us")
+        self.pending_html[about_widget] = (about_text, ABOUT_HTML)
+        self.tabs.currentChanged.connect(self.on_tab_changed)
 
         # Footer
         footer = QLabel("RFTX TUNING – Free BMW ECU Flasher | v1.0 | Contact: rftxtuning@gmail.com")
-        footer.setFont(QFont("Segoe UI", 9))
+        footer.setFont(ui_font(9))
         footer.setAlignment(Qt.AlignCenter)
-        footer.setStyleSheet("color: #666666; padding: 10px;")
+        footer.setObjectName("footer")
         main_layout.addWidget(footer)
 
+    def on_tab_changed(self, index):
+        pending = self.pending_html.pop(self.tabs.widget(index), None)
+        if pending:
+            text_widget, html = pending
+            text_widget.setHtml(html)
+
     def setup_logging(self):
         """Redirect logging to the GUI log tab."""
-        class LogHandler(logging.Handler):
-            def __init__(self, text_widget):
-                super().__init__()
-                self.text_widget = text_widget
-
-            def emit(self, record):
-                msg = self.format(record)
-                self.text_widget.append(msg)
-                self.text_widget.ensureCursorVisible()
-
-        log_handler = LogHandler(self.log_text)
+        # Replace the handler of any earlier window so records are not queued twice
+        for handler in [h for h in logger.handlers if isinstance(h, LogHandler)]:
+            logger.removeHandler(handler)
+
+        self.log_queue = deque(maxlen=LOG_QUEUE_SIZE)
+        self.log_text.document().setMaximumBlockCount(LOG_MAX_LINES)
+        log_handler = LogHandler(self.log_queue)
+        log_handler.setLevel(logging.INFO)
         log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
         logger.addHandler(log_handler)
+        self.log_timer = QTimer(self)
+        self.log_timer.timeout.connect(self.flush_logs)
+        self.log_timer.start(LOG_FLUSH_INTERVAL_MS)
 
-    def show_splash(self):
-        """Show loading splash screen."""
-        splash = QSplashScreen(QPixmap(400, 200))
-        splash.setStyleSheet("background-color: #1C1C1C; color: #0078FF;")
-        label = QLabel("RFTX TUNING\nLoading...", splash)
-        label.setFont(QFont("Segoe UI", 18, QFont.Bold))
-        label.setAlignment(Qt.AlignCenter)
-        label.setStyleSheet("color: #0078FF;")
-        label.resize(400, 200)
-        splash.show()
-        QApplication.processEvents()
-        time.sleep(2)  # Simulate initialization
-        splash.close()
+    def flush_logs(self):
+        """Write queued log records to the log tab in one update."""
+        if not self.log_queue:
+            return
+        lines = [self.log_queue.popleft() for _ in range(len(self.log_queue))]
+        self.log_text.append("\n".join(lines))
+        self.log_text.ensureCursorVisible()
+
+    def on_ports_found(self, success, message, data):
+        self.thread = None
+        self.port_combo.addItems(data.get("ports", []))
 
     def on_connect_clicked(self):
         if self.thread and self.thread.isRunning():
@@ -580,12 +641,12 @@ class RFTXMainWindow(QMainWindow):
         self.thread = None
         if success:
             dtcs = data.get("dtcs", [])
-            self.dtc_list.clear()
             if not dtcs:
-                self.dtc_list.append("No DTCs found")
+                self.dtc_list.setPlainText("No DTCs found")
             else:
-                for dtc in dtcs:
-                    self.dtc_list.append(f"{dtc['text']} - Status: {bin(dtc['status'])[2:].zfill(8)}")
+                self.dtc_list.setPlainText("\n".join(
+                    f"{dtc['text']} - Status: {DTC_STATUS_BITS[dtc['status']]}" for dtc in dtcs
+                ))
         else:
             QMessageBox.critical(self, "Error", message)
 
@@ -638,7 +699,10 @@ class RFTXMainWindow(QMainWindow):
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
+    # Paint the splash before building the main window, and keep it up until the window is shown
+    splash = show_splash()
+    app.processEvents()
     window = RFTXMainWindow()
-    window.show_splash()
     window.show()
-    sys.exit(app.exec_())
+    splash.finish(window)
+    sys.exit(app.exec_())
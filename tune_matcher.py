@@ -3,60 +3,131 @@ import json
 import zipfile
 import tempfile
 import re
-import shutil
+import functools
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Tuple, Optional
 
 logger = logging.getLogger('RFTX.TuneMatcher')
 
+# Common BMW ECU types, compiled once
+ECU_TYPE_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'MSD8[0-9]',    # MSD80, MSD81, etc.
+    r'MEVD17\.[0-9]', # MEVD17.x
+    r'MG1',          # MG1
+    r'MD1',          # MD1
+    r'MSV[0-9]+',    # MSV70, MSV80, etc.
+    r'DME[0-9]*'     # DME, DME7, etc.
+))
+
+# Common BMW engine codes, in order of preference
+ENGINE_CODES = ('N54', 'N55', 'S55', 'B58', 'S58', 'N52', 'N20', 'B48')
+
+# Stage number and octane rating in tune paths and filenames
+STAGE_PATTERN = re.compile(r'stage\s*(\d+)')
+OCTANE_PATTERN = re.compile(r'(\d{2,3})oct')
+
 class TuneMatcher:
     def __init__(self, tunes_directory: str = "."):
         """Initialize the TuneMatcher with the directory containing tune zip files."""
         self.tunes_directory = tunes_directory
-        self.temp_dir = tempfile.mkdtemp()
+        # Removed by cleanup(), or by its finalizer if the app exits without calling it
+        self.temp_directory = tempfile.TemporaryDirectory(prefix='rftx_tunes_')
+        self.temp_dir = self.temp_directory.name
         self.available_tunes = []
-        self.extracted_paths = {}
+        # Directory mtime when available_tunes was last scanned
+        self.scan_mtime = None
+        # Member names per zip filename, with the zip mtime they were read at
+        self.zip_listings = {}
+        # Paths of members extracted on demand, by zip filename and member name;
+        # dropped for a zip when its listing is read again after it changed
+        self.extracted_members = {}
+        # Compiled vin_pattern regexes from tune_info.json files, by pattern string
+        self.vin_regexes = {}
+        # Parsed tune_info.json files, by zip path, with the zip mtime they were read at
+        self.tune_infos = {}
+        # Match results per (vin, ecu_id, sw_version), valid while no tune package has changed
+        self.match_cache = {}
+        self.match_cache_mtimes = None
         
     def scan_available_tunes(self) -> List[str]:
         """Scan the tunes directory for available zip files."""
+        # Only list the directory again once its contents have changed
+        mtime = os.stat(self.tunes_directory).st_mtime_ns
+        if mtime == self.scan_mtime:
+            return self.available_tunes
+            
+        self.scan_mtime = mtime
         self.available_tunes = [f for f in os.listdir(self.tunes_directory) 
                                if f.endswith('.zip') and os.path.isfile(os.path.join(self.tunes_directory, f))]
         logger.info(f"Found {len(self.available_tunes)} tune packages: {', '.join(self.available_tunes)}")
         return self.available_tunes
     
-    def extract_tune_zip(self, zip_filename: str) -> str:
-        """Extract a tune zip file to a temporary directory."""
-        if zip_filename in self.extracted_paths:
-            return self.extracted_paths[zip_filename]
-            
+    def list_tune_zip(self, zip_filename: str) -> List[str]:
+        """List the members of a tune zip file without extracting it."""
         zip_path = os.path.join(self.tunes_directory, zip_filename)
-        extract_path = os.path.join(self.temp_dir, os.path.splitext(zip_filename)[0])
-        
-        os.makedirs(extract_path, exist_ok=True)
-        
-        logger.info(f"Extracting {zip_filename} to temporary directory")
+        mtime = os.stat(zip_path).st_mtime_ns
+        listing = self.zip_listings.get(zip_filename)
+        if listing and listing[0] == mtime:
+            return listing[1]
+            
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_path)
+            members = zip_ref.namelist()
+        self.zip_listings[zip_filename] = (mtime, members)
+        # Members extracted from an earlier version of the zip are out of date
+        self.extracted_members[zip_filename] = {}
+        return members
+    
+    def extract_tune_members(self, zip_filename: str, members: List[str]) -> List[str]:
+        """Extract files from a tune zip, opening the archive once for all that are not yet extracted."""
+        extracted = self.extracted_members.setdefault(zip_filename, {})
+        missing = [member for member in members if member not in extracted]
+        if missing:
+            zip_path = os.path.join(self.tunes_directory, zip_filename)
+            extract_path = os.path.join(self.temp_dir, os.path.splitext(zip_filename)[0])
             
-        self.extracted_paths[zip_filename] = extract_path
-        return extract_path
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                for member in missing:
+                    extracted[member] = zip_ref.extract(member, extract_path)
+                    
+        return [extracted[member] for member in members]
     
-    def find_tune_info_json(self, extract_path: str) -> Optional[Dict]:
-        """Look for tune_info.json in the extracted directory."""
-        json_path = os.path.join(extract_path, 'tune_info.json')
-        if os.path.exists(json_path):
-            try:
-                with open(json_path, 'r') as f:
-                    tune_info = json.load(f)
-                    logger.info(f"Found tune_info.json with {len(tune_info.get('tunes', []))} tune definitions")
-                    return tune_info
-            except json.JSONDecodeError:
-                logger.warning(f"Invalid JSON in tune_info.json")
-                return None
-        return None
+    def read_tune_info_from_zip(self, zip_filename: str) -> Optional[Dict]:
+        """Read tune_info.json straight from a tune zip without extracting it."""
+        zip_path = os.path.join(self.tunes_directory, zip_filename)
+        mtime = os.stat(zip_path).st_mtime_ns
+        cached = self.tune_infos.get(zip_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+            
+        try:
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                tune_info = json.loads(zip_ref.read('tune_info.json'))
+                logger.info(f"Found tune_info.json with {len(tune_info.get('tunes', []))} tune definitions")
+        except KeyError:
+            tune_info = None
+        except json.JSONDecodeError:
+            logger.warning(f"Invalid JSON in tune_info.json")
+            tune_info = None
+        self.tune_infos[zip_path] = (mtime, tune_info)
+        return tune_info
     
     def find_matching_tunes(self, vin: str, ecu_id: str, sw_version: str) -> List[Dict]:
         """Find tunes that match the car's ECU information."""
+        # Overwriting a package in place keeps the directory mtime, so the cached
+        # results are tied to the name and mtime of every package
+        zip_files = self.scan_available_tunes()
+        mtimes = tuple((zip_file, os.stat(os.path.join(self.tunes_directory, zip_file)).st_mtime_ns)
+                       for zip_file in zip_files)
+        if mtimes != self.match_cache_mtimes:
+            self.match_cache.clear()
+            self.match_cache_mtimes = mtimes
+            
+        # Callers get their own copies, the cached dicts are never handed out
+        key = (vin, ecu_id, sw_version)
+        if key in self.match_cache:
+            return [dict(tune) for tune in self.match_cache[key]]
+            
         matching_tunes = []
         
         # Extract ECU type and engine code
@@ -65,58 +136,76 @@ class TuneMatcher:
         
         logger.info(f"Searching for tunes matching ECU type: {ecu_type}, Engine: {engine_code}")
         
-        # Scan all available tune zip files
-        for zip_file in self.scan_available_tunes():
-            extract_path = self.extract_tune_zip(zip_file)
-            
-            # Check if there's a tune_info.json for better matching
-            tune_info = self.find_tune_info_json(extract_path)
-            
-            # Walk through the extracted directory to find .bin files
-            for root, dirs, files in os.walk(extract_path):
-                for file in files:
-                    if file.endswith('.bin'):
-                        # Determine tune type from folder structure and filename
-                        relative_path = os.path.relpath(root, extract_path)
-                        tune_type = self._determine_tune_type(relative_path, file)
-                        
-                        # Check if this tune matches the ECU
-                        match_confidence = self._check_tune_match(
-                            file, relative_path, tune_info, 
-                            vin, ecu_id, sw_version, ecu_type, engine_code
-                        )
-                        
-                        if match_confidence > 0:
-                            matching_tunes.append({
-                                'zip_file': zip_file,
-                                'bin_file': file,
-                                'relative_path': relative_path,
-                                'full_path': os.path.join(root, file),
-                                'tune_type': tune_type,
-                                'match_confidence': match_confidence,
-                                'ecu_type': ecu_type,
-                                'engine_code': engine_code
-                            })
+        # Lowercased search terms, compared against every bin path
+        lowered = (ecu_id.lower(), ecu_type.lower(), sw_version.lower(), engine_code.lower())
+        
+        # Match each tune package on its own thread; extracting the matched
+        # bins is zlib work that releases the GIL
+        if zip_files:
+            match_zip = functools.partial(self._match_tune_zip, vin=vin, ecu_id=ecu_id, sw_version=sw_version,
+                                          ecu_type=ecu_type, engine_code=engine_code, lowered=lowered)
+            with ThreadPoolExecutor(max_workers=min(len(zip_files), os.cpu_count() or 4)) as pool:
+                for tunes in pool.map(match_zip, zip_files):
+                    matching_tunes.extend(tunes)
         
         # Sort by match confidence (higher is better)
         matching_tunes.sort(key=lambda x: x['match_confidence'], reverse=True)
         logger.info(f"Found {len(matching_tunes)} matching tunes")
-        return matching_tunes
+        self.match_cache[key] = matching_tunes
+        return [dict(tune) for tune in matching_tunes]
+    
+    def _match_tune_zip(self, zip_file: str, vin: str, ecu_id: str, sw_version: str,
+                        ecu_type: str, engine_code: str,
+                        lowered: Tuple[str, str, str, str]) -> List[Dict]:
+        """Find the tunes in one tune zip file that match the car's ECU."""
+        tunes = []
+        matched_members = []
+        # Normalized relative path per archive directory, shared by its bins
+        relative_paths = {}
+        
+        # Match on the archive's member names; only matching .bin files are extracted
+        members = self.list_tune_zip(zip_file)
+        
+        # Check if there's a tune_info.json for better matching
+        tune_info = self.read_tune_info_from_zip(zip_file) if 'tune_info.json' in members else None
+        tune_scores = self._resolve_tune_info(tune_info, vin, ecu_id, sw_version, ecu_type, engine_code)
+        
+        for member in members:
+            if not member.endswith('.bin'):
+                continue
+                
+            directory, _, file = member.rpartition('/')
+            relative_path = relative_paths.get(directory)
+            if relative_path is None:
+                relative_path = relative_paths[directory] = os.path.normpath(directory or '.')
+            
+            # Check if this tune matches the ECU
+            match_confidence = self._check_tune_match(file, relative_path, tune_scores, engine_code, lowered)
+            
+            if match_confidence > 0:
+                # Determine tune type from folder structure and filename
+                tune_type = self._determine_tune_type(relative_path, file)
+                matched_members.append(member)
+                tunes.append({
+                    'zip_file': zip_file,
+                    'bin_file': file,
+                    'relative_path': relative_path,
+                    'tune_type': tune_type,
+                    'match_confidence': match_confidence,
+                    'ecu_type': ecu_type,
+                    'engine_code': engine_code
+                })
+                
+        # Extract every matching bin with a single pass over the archive
+        for tune, full_path in zip(tunes, self.extract_tune_members(zip_file, matched_members)):
+            tune['full_path'] = full_path
+            
+        return tunes
     
     def _extract_ecu_type(self, ecu_id: str) -> str:
         """Extract the ECU type from the ECU ID."""
-        # Common BMW ECU types
-        ecu_patterns = [
-            r'MSD8[0-9]',    # MSD80, MSD81, etc.
-            r'MEVD17\.[0-9]', # MEVD17.x
-            r'MG1',          # MG1
-            r'MD1',          # MD1
-            r'MSV[0-9]+',    # MSV70, MSV80, etc.
-            r'DME[0-9]*'     # DME, DME7, etc.
-        ]
-        
-        for pattern in ecu_patterns:
-            match = re.search(pattern, ecu_id, re.IGNORECASE)
+        for pattern in ECU_TYPE_PATTERNS:
+            match = pattern.search(ecu_id)
             if match:
                 return match.group(0).upper()
         
@@ -124,36 +213,26 @@ class TuneMatcher:
     
     def _extract_engine_code(self, ecu_id: str, sw_version: str) -> str:
         """Extract the engine code from ECU ID or software version."""
-        # Common BMW engine codes
-        engine_patterns = [
-            r'N54',
-            r'N55',
-            r'S55',
-            r'B58',
-            r'S58',
-            r'N52',
-            r'N20',
-            r'B48'
-        ]
-        
-        # Check in both ECU ID and software version
-        combined = ecu_id + " " + sw_version
+        # Check in both ECU ID and software version; the codes are plain literals
+        combined = (ecu_id + " " + sw_version).upper()
         
-        for pattern in engine_patterns:
-            if re.search(pattern, combined, re.IGNORECASE):
-                return pattern.upper()
+        for code in ENGINE_CODES:
+            if code in combined:
+                return code
         
         return "UNKNOWN"
     
-    def _determine_tune_type(self, relative_path: str, filename: str) -> str:
-        """Determine the tune type from the path and filename."""
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _determine_tune_type(relative_path: str, filename: str) -> str:
+        """Determine the tune type from the path and filename (cached, bins recur across searches)."""
         # Check for common tune type indicators in the path
         path_lower = relative_path.lower()
         file_lower = filename.lower()
         combined = path_lower + " " + file_lower
         
         # Look for stage information
-        stage_match = re.search(r'stage\s*(\d+)', combined)
+        stage_match = STAGE_PATTERN.search(combined)
         stage = f"Stage {stage_match.group(1)}" if stage_match else ""
         
         # Look for fuel type
@@ -165,7 +244,7 @@ class TuneMatcher:
         elif "e30" in combined:
             fuel_type = "E30"
         elif "pump" in combined or "91" in combined or "93" in combined:
-            octane_match = re.search(r'(\d{2,3})oct', combined)
+            octane_match = OCTANE_PATTERN.search(combined)
             if octane_match:
                 fuel_type = f"{octane_match.group(1)} Octane"
             else:
@@ -206,64 +285,86 @@ class TuneMatcher:
         # If we couldn't determine a specific type, use the filename without extension
         return os.path.splitext(filename)[0]
     
-    def _check_tune_match(self, filename: str, relative_path: str, 
-                         tune_info: Optional[Dict], vin: str, 
-                         ecu_id: str, sw_version: str,
-                         ecu_type: str, engine_code: str) -> int:
+    def _vin_regex(self, pattern: str) -> re.Pattern:
+        """Return the compiled regex for a tune_info.json vin_pattern."""
+        regex = self.vin_regexes.get(pattern)
+        if regex is None:
+            regex = self.vin_regexes[pattern] = re.compile(pattern)
+        return regex
+    
+    def _resolve_tune_info(self, tune_info: Optional[Dict], vin: str,
+                           ecu_id: str, sw_version: str,
+                           ecu_type: str, engine_code: str) -> Optional[Tuple[Dict, Dict, int]]:
+        """
+        Work out once per package which tune_info.json entries apply to the car's ECU.
+        Returns (scores by bin file, scores by path, confidence when no bin is listed);
+        scores are (entry position, score) so the first listing entry wins.
+        """
+        if not tune_info:
+            return None
+            
+        by_bin_file = {}
+        by_path = {}
+        confidence = 0
+        for position, tune in enumerate(tune_info.get('tunes', [])):
+            # Each entry matches on its first applicable field; the score applies
+            # to the bins and paths it lists, the lower confidence to all others
+            if tune.get('ecu_id') == ecu_id:
+                score = (position, 100)  # Perfect match from tune_info.json
+                confidence = max(confidence, 90)
+            elif tune.get('sw_version') == sw_version:
+                score = (position, 95)  # Very good match from tune_info.json
+                confidence = max(confidence, 85)
+            elif tune.get('vin_pattern') and self._vin_regex(tune['vin_pattern']).search(vin):
+                score = (position, 90)  # Good match from tune_info.json
+                confidence = max(confidence, 80)
+            elif tune.get('ecu_type') == ecu_type:
+                score = (position, 85)  # Good match from tune_info.json
+                confidence = max(confidence, 75)
+            elif tune.get('engine_code') == engine_code:
+                score = (position, 80)  # Good match from tune_info.json
+                confidence = max(confidence, 70)
+            else:
+                continue
+                
+            for bin_file in tune.get('bin_files', []):
+                by_bin_file.setdefault(bin_file, score)
+            for path in tune.get('paths', []):
+                by_path.setdefault(path, score)
+                
+        return by_bin_file, by_path, confidence
+    
+    def _check_tune_match(self, filename: str, relative_path: str,
+                         tune_scores: Optional[Tuple[Dict, Dict, int]], engine_code: str,
+                         lowered: Tuple[str, str, str, str]) -> int:
         """
         Check if a tune matches the car's ECU.
         Returns a confidence score (0-100) where higher is better match.
         """
         confidence = 0
         path_and_file = (relative_path + '/' + filename).lower()
+        ecu_id_lower, ecu_type_lower, sw_version_lower, engine_code_lower = lowered
         
         # If we have tune_info.json, use it for precise matching
-        if tune_info:
-            for tune in tune_info.get('tunes', []):
-                # Check for direct ECU ID match
-                if tune.get('ecu_id') == ecu_id:
-                    # Check if this specific bin file is mentioned
-                    if filename in tune.get('bin_files', []) or relative_path in tune.get('paths', []):
-                        return 100  # Perfect match from tune_info.json
-                    confidence = max(confidence, 90)
-                
-                # Check for software version match
-                elif tune.get('sw_version') == sw_version:
-                    if filename in tune.get('bin_files', []) or relative_path in tune.get('paths', []):
-                        return 95  # Very good match from tune_info.json
-                    confidence = max(confidence, 85)
-                
-                # Check for VIN pattern match
-                elif tune.get('vin_pattern') and re.search(tune.get('vin_pattern'), vin):
-                    if filename in tune.get('bin_files', []) or relative_path in tune.get('paths', []):
-                        return 90  # Good match from tune_info.json
-                    confidence = max(confidence, 80)
-                
-                # Check for ECU type match
-                elif tune.get('ecu_type') == ecu_type:
-                    if filename in tune.get('bin_files', []) or relative_path in tune.get('paths', []):
-                        return 85  # Good match from tune_info.json
-                    confidence = max(confidence, 75)
-                
-                # Check for engine code match
-                elif tune.get('engine_code') == engine_code:
-                    if filename in tune.get('bin_files', []) or relative_path in tune.get('paths', []):
-                        return 80  # Good match from tune_info.json
-                    confidence = max(confidence, 70)
+        if tune_scores:
+            by_bin_file, by_path, confidence = tune_scores
+            listed = [score for score in (by_bin_file.get(filename), by_path.get(relative_path)) if score]
+            if listed:
+                return min(listed)[1]
         
         # Direct matching based on path and filename
-        if ecu_id.lower() in path_and_file:
+        if ecu_id_lower in path_and_file:
             confidence = max(confidence, 90)
-        elif ecu_type.lower() in path_and_file:
+        elif ecu_type_lower in path_and_file:
             confidence = max(confidence, 80)
-        elif sw_version.lower() in path_and_file:
+        elif sw_version_lower in path_and_file:
             confidence = max(confidence, 85)
-        elif engine_code.lower() in path_and_file:
+        elif engine_code_lower in path_and_file:
             confidence = max(confidence, 75)
             
         # Check for common BMW engine codes in the path if we don't already have a match
         if confidence < 60 and engine_code != "UNKNOWN":
-            if engine_code.lower() in path_and_file:
+            if engine_code_lower in path_and_file:
                 confidence = max(confidence, 60)
                 
         # If we have no better match but the file is in a folder structure that seems relevant
@@ -279,7 +380,9 @@ class TuneMatcher:
     def cleanup(self):
         """Clean up temporary files."""
         try:
-            shutil.rmtree(self.temp_dir)
+            self.temp_directory.cleanup()
+            self.extracted_members.clear()
+            self.match_cache.clear()
             logger.info("Cleaned up temporary files")
         except Exception as e:
             logger.error(f"Error cleaning up temporary files: {str(e)}")